@@ -0,0 +1,222 @@
+"""
+Offline ingest benchmark.
+
+Replays feed bodies from a local HTTP stand-in and reports items/sec and peak
+memory for each ingest stage: RSSFetcher (batch and streaming), the breaking
+news classifier and the posted-item dedup (FingerprintStore.is_posted).
+
+    # Record the configured feeds once into automation/benchmarks/fixtures/
+    python automation/benchmarks/ingest_bench.py --record
+
+    # Replay the recorded fixtures
+    python automation/benchmarks/ingest_bench.py
+
+    # Synthetic load: 100 feeds x 1,000 Devanagari entries
+    python automation/benchmarks/ingest_bench.py --synthetic --feeds 100 --entries 1000
+"""
+import argparse
+import asyncio
+import functools
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+from email.utils import formatdate
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+sys.path.append(os.getcwd())
+
+from automation.config_loader import ConfigLoader
+from automation.content.classifier import NewsClassifier
+from automation.content.news_fetcher import RSSFetcher
+from automation.state.fingerprint_store import FingerprintStore
+
+FIXTURE_DIR = "automation/benchmarks/fixtures"
+DEFAULT_CONFIG = "automation/config/nepali_news.yaml"
+
+WORDS = [
+    "काठमाडौं", "सरकार", "प्रदेश", "नगरपालिका", "बैठक", "नेता", "जनता", "विकास", "सडक", "अस्पताल",
+    "विद्यालय", "किसान", "मूल्य", "वृद्धि", "घोषणा", "सम्झौता", "भेट", "कार्यक्रम", "उद्घाटन", "माग",
+]
+
+
+def record(config_path: str):
+    """Downloads every feed in the channel config into FIXTURE_DIR, one file per feed."""
+    config = ConfigLoader.load_config(config_path)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for url in config['feeds']:
+        path = os.path.join(FIXTURE_DIR, fixture_name(url))
+        try:
+            request = urllib.request.Request(url, headers={"User-Agent": RSSFetcher.USER_AGENT})
+            with urllib.request.urlopen(request, timeout=30) as response:
+                body = response.read()
+            with open(path, 'wb') as f:
+                f.write(body)
+            print(f"Recorded {url} -> {path} ({len(body)} bytes)")
+        except Exception as e:
+            print(f"Error recording {url}: {e}")
+
+
+def fixture_name(url: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', url.split("://", 1)[-1]).strip('_') + ".xml"
+
+
+def generate_synthetic(directory: str, feeds: int, entries: int, seed: int = 7):
+    """
+    Writes `feeds` RSS files of `entries` items each. Headlines are random
+    Devanagari word runs, about one in ten carrying a breaking keyword, and publish
+    times are spread over the last day so the recency window has work to do.
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    for f in range(feeds):
+        parts = [f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>Feed {f}</title>']
+        for e in range(entries):
+            words = rng.sample(WORDS, 6)
+            if rng.random() < 0.1:
+                words.insert(rng.randrange(6), rng.choice(NewsClassifier.BREAKING_KEYWORDS))
+            title = " ".join(words)
+            link = f"https://feed{f}.example.com/news/{e}"
+            pub = formatdate(now - rng.uniform(0, 86400), localtime=False)
+            parts.append(
+                f"<item><title>{escape(title)}</title><link>{link}</link><guid>{link}</guid>"
+                f"<description>{escape(' '.join(rng.choices(WORDS, k=40)))}</description>"
+                f"<pubDate>{pub}</pubDate></item>"
+            )
+        parts.append("</channel></rss>")
+        with open(os.path.join(directory, f"feed{f}.xml"), 'w', encoding='utf-8') as out:
+            out.write("".join(parts))
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory: str, hosts: int):
+    """
+    Serves `directory` on loopback, one server per 127.0.0.x address so the
+    fetcher's per-host connection limit behaves as it does with several sites.
+    Falls back to 127.0.0.1 alone where other loopback addresses cannot be bound.
+    """
+    handler = functools.partial(QuietHandler, directory=directory)
+    servers = []
+    for i in range(1, hosts + 1):
+        try:
+            server = ThreadingHTTPServer((f"127.0.0.{i}", 0), handler)
+        except OSError:
+            break
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def feed_urls(directory: str, servers) -> list:
+    names = sorted(n for n in os.listdir(directory) if n.endswith(".xml"))
+    return [f"http://{servers[i % len(servers)].server_address[0]}:{servers[i % len(servers)].server_address[1]}/{name}"
+            for i, name in enumerate(names)]
+
+
+def measure(name: str, run, count_of, memory: bool = True):
+    """Runs `run` once for time and, if memory, once more under tracemalloc for the peak."""
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    count = count_of(result)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    rate = count / elapsed if elapsed else float('inf')
+    peak_text = f"{peak / 1024 / 1024:8.1f} MiB" if peak is not None else "       -    "
+    print(f"{name:<30} {count:>9} items {elapsed:8.2f}s {rate:>12,.0f} items/s  peak {peak_text}")
+    return result
+
+
+def bench(urls, window_hours: float, posted: int, memory: bool):
+    def fetch_batch():
+        fetcher = RSSFetcher(urls, max_connections=len(urls))
+        try:
+            return asyncio.run(_fetch_batch(fetcher))
+        finally:
+            fetcher._parse_pool.shutdown()
+
+    def fetch_stream():
+        fetcher = RSSFetcher(urls, max_connections=len(urls))
+        try:
+            # Counted without keeping the items, as the pipeline consumes them
+            return sum(1 for _ in fetcher.fetch_iter())
+        finally:
+            fetcher._parse_pool.shutdown()
+
+    print(f"Replaying {len(urls)} feeds")
+    items = measure("RSSFetcher.fetch_all_async", fetch_batch, len, memory)
+    measure("RSSFetcher.fetch_iter", fetch_stream, lambda n: n, memory)
+
+    classifier = NewsClassifier(breaking_window_hours=window_hours)
+    measure("NewsClassifier.filter_breaking", lambda: classifier.filter_breaking(items), lambda _: len(items), memory)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Same shape as the stored history: a hash and a headline hash per posted item
+        posted_hashes = FingerprintStore(os.path.join(tmp, "posted.bin"), os.path.join(tmp, "posted.bloom"), legacy_files=[])
+        posted_hashes.add_many(h for item in items[:posted // 2] for h in (item['hash'], item['headline_hash']))
+        # Lookups then go through the Bloom filter and sorted file, as for a long-lived store
+        posted_hashes.compact()
+        measure("FingerprintStore.is_posted",
+                lambda: [item for item in items if not posted_hashes.is_posted(item)],
+                lambda _: len(items), memory)
+
+
+async def _fetch_batch(fetcher: RSSFetcher):
+    try:
+        return await fetcher.fetch_all_async()
+    finally:
+        await fetcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ingest benchmark")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="Channel config whose feeds --record downloads")
+    parser.add_argument("--record", action="store_true", help="Record the configured feeds as fixtures and exit")
+    parser.add_argument("--synthetic", action="store_true", help="Replay generated feeds instead of the fixtures")
+    parser.add_argument("--feeds", type=int, default=100, help="Synthetic feed count")
+    parser.add_argument("--entries", type=int, default=1000, help="Synthetic entries per feed")
+    parser.add_argument("--hosts", type=int, default=6, help="Loopback hosts the feeds are spread over")
+    parser.add_argument("--window-hours", type=float, default=4, help="Classifier breaking window")
+    parser.add_argument("--posted", type=int, default=500, help="Size of the posted-hash history")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.config)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = FIXTURE_DIR
+        if args.synthetic:
+            directory = tmp
+            start = time.perf_counter()
+            generate_synthetic(directory, args.feeds, args.entries)
+            print(f"Generated {args.feeds} x {args.entries} entries in {time.perf_counter() - start:.1f}s")
+        elif not os.path.isdir(directory) or not os.listdir(directory):
+            print(f"No fixtures in {directory}; run with --record first or use --synthetic.")
+            return
+
+        servers = serve(directory, args.hosts)
+        try:
+            bench(feed_urls(directory, servers), args.window_hours, args.posted, not args.no_memory)
+        finally:
+            for server in servers:
+                server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
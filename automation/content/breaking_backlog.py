@@ -0,0 +1,65 @@
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Set
+
+class BreakingBacklog:
+    """
+    Breaking candidates a run saw but did not handle: ranked below the render
+    budget, over the video limit, or failed to render/upload. Feed cursors
+    move past every fetched entry, so without this they would never be
+    considered again. The next poll feeds them back in ahead of the fresh
+    items; entries older than max_age_hours (the breaking window) are dropped.
+    """
+    # Per-run annotations added by the pipeline; recomputed when the item comes back
+    RUN_FIELDS = ("cluster_id", "outlets", "cluster_posted", "score")
+
+    def __init__(self, path: str = None, max_age_hours: float = 2):
+        self.path = path
+        self.max_age = max_age_hours * 3600
+        # hash -> {"queued_at": ts, "item": item}
+        self.entries: Dict[str, Dict] = self._load()
+
+    def items(self) -> List[Dict]:
+        self._expire()
+        return [dict(entry["item"]) for entry in self.entries.values()]
+
+    def update(self, candidates: Iterable[Dict], handled: Set[str], now: float = None):
+        """Queues the candidates not in `handled` (item hashes) and forgets the handled ones."""
+        now = int(now or time.time())
+        for item in candidates:
+            key = item['hash']
+            if key in handled:
+                self.entries.pop(key, None)
+            elif key not in self.entries:
+                stored = {k: v for k, v in item.items() if k not in self.RUN_FIELDS}
+                self.entries[key] = {"queued_at": now, "item": stored}
+
+    def save(self):
+        if not self.path:
+            return
+        self._expire()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(self.path + ".tmp", self.path)
+        except Exception as e:
+            print(f"Error saving breaking backlog {self.path}: {e}")
+
+    def _expire(self, now: float = None):
+        cutoff = (now or time.time()) - self.max_age
+        self.entries = {
+            key: entry for key, entry in self.entries.items()
+            # Undated items (e.g. Telegram posts) age from when they were queued
+            if (entry["item"].get("published_ts") or entry["queued_at"]) >= cutoff
+        }
+
+    def _load(self) -> Dict[str, Dict]:
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Ignoring unreadable breaking backlog {self.path}: {e}")
+        return {}
@@ -1,4 +1,7 @@
-from typing import List, Dict
+import time
+import numpy as np
+from typing import List, Dict, Iterable, Iterator, AsyncIterator, Tuple
+from .keyword_matcher import KeywordMatcher
 
 class NewsClassifier:
     BREAKING_KEYWORDS = [
@@ -14,15 +17,53 @@ class NewsClassifier:
         "स्वास्थ्य", "वैदेशिक रोजगार", "पर्यटन"
     ]
 
-    def __init__(self, breaking_window_hours: int = 2):
+    def __init__(self, breaking_window_hours: float = 2, keywords: List[str] = None, match_content: bool = False):
         self.breaking_window_hours = breaking_window_hours
+        # Channel YAML may replace the keyword list; content matching is opt-in since bodies are long
+        self.matcher = KeywordMatcher(keywords or self.BREAKING_KEYWORDS)
+        self.fields = ("headline", "content") if match_content else ("headline",)
 
     def classify(self, news_item: Dict) -> str:
-        headline = news_item.get('headline', '').lower()
-        is_urgent = any(kw in headline for kw in self.BREAKING_KEYWORDS)
+        is_urgent = any(self.matcher.contains_any(news_item.get(field) or '') for field in self.fields)
         if is_urgent:
             return "BREAKING"
         return "NORMAL"
 
-    def filter_breaking(self, news_items: List[Dict]) -> List[Dict]:
+    def match_keywords(self, news_item: Dict) -> Dict[str, List[Tuple[str, int]]]:
+        """Keyword hits per field, e.g. {"headline": [("भूकम्प", 12)], "content": []}."""
+        return {field: self.matcher.find_all(news_item.get(field) or '') for field in self.fields}
+
+    def filter_breaking(self, news_items: List[Dict], now: float = None) -> List[Dict]:
+        news_items = [news_items[i] for i in np.flatnonzero(self.recent_mask(news_items, now))]
         return [item for item in news_items if self.classify(item) == "BREAKING"]
+
+    def recent_mask(self, news_items: List[Dict], now: float = None) -> np.ndarray:
+        """
+        Boolean mask of items published inside the breaking window, computed over
+        the whole batch at once. Items without a publish time (0) are kept.
+        """
+        stamps = np.fromiter((item.get("published_ts", 0) for item in news_items), dtype=np.int64, count=len(news_items))
+        return (stamps == 0) | (stamps >= self._cutoff(now))
+
+    def is_recent(self, news_item: Dict, now: float = None) -> bool:
+        ts = news_item.get("published_ts", 0)
+        return not ts or ts >= self._cutoff(now)
+
+    def iter_breaking(self, news_items: Iterable[Dict]) -> Iterator[Dict]:
+        """Lazy version of filter_breaking() for streamed items."""
+        for item in news_items:
+            if self.is_recent(item) and self.classify(item) == "BREAKING":
+                yield item
+
+    async def aiter_breaking(self, news_items) -> AsyncIterator[Dict]:
+        """Async twin of iter_breaking(); accepts an async iterable such as RSSFetcher.fetch_iter_async()."""
+        if not hasattr(news_items, "__aiter__"):
+            for item in self.iter_breaking(news_items):
+                yield item
+            return
+        async for item in news_items:
+            if self.is_recent(item) and self.classify(item) == "BREAKING":
+                yield item
+
+    def _cutoff(self, now: float = None) -> int:
+        return int((now or time.time()) - self.breaking_window_hours * 3600)
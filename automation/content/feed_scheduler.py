@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from typing import List, Dict
+
+class FeedScheduler:
+    """
+    Learns how often each feed publishes and polls it on its own interval.
+    The mean gap between new entries is tracked as an exponential moving
+    average and the feed is polled at half that gap, within [min, max].
+    Feeds that keep returning nothing new back off towards the maximum.
+    """
+    POLL_FRACTION = 0.5   # Poll twice per expected new entry
+    BACKOFF = 1.5         # Interval growth after a poll with nothing new
+    SMOOTHING = 0.3       # Weight of the newest gap observation
+    SLACK = 0.1           # Treat feeds due within 10% of their interval as due (cron jitter)
+
+    def __init__(self, feeds: List[str], state_file: str = None, min_interval_minutes: float = 5,
+                 max_interval_minutes: float = 180, default_interval_minutes: float = 30):
+        self.feeds = feeds
+        self.state_file = state_file
+        self.min_interval = min_interval_minutes * 60
+        self.max_interval = max_interval_minutes * 60
+        self.default_interval = default_interval_minutes * 60
+        self.state = self._load_state()
+
+    def due_feeds(self, now: float = None) -> List[str]:
+        now = now or time.time()
+        return [url for url in self.feeds if self._next_poll(url) - self.SLACK * self._interval(url) <= now]
+
+    def seconds_until_due(self, now: float = None) -> float:
+        """Time until the next feed becomes due, 0 if one already is."""
+        now = now or time.time()
+        if not self.feeds:
+            return self.default_interval
+        return max(0.0, min(self._next_poll(url) - self.SLACK * self._interval(url) for url in self.feeds) - now)
+
+    def record(self, url: str, new_entry_timestamps: List[int], now: float = None):
+        """
+        Updates a feed's interval after a successful poll.
+        new_entry_timestamps are the published_ts of entries not seen before (0 = unknown).
+        """
+        now = now or time.time()
+        st = self.state.setdefault(url, {"interval": self.default_interval, "gap": None, "newest_ts": 0})
+        stamps = sorted(ts for ts in new_entry_timestamps if ts)
+
+        if stamps:
+            gap = None
+            if st["newest_ts"] and stamps[-1] > st["newest_ts"]:
+                gap = (stamps[-1] - st["newest_ts"]) / len(stamps)
+            elif len(stamps) > 1:
+                gap = (stamps[-1] - stamps[0]) / (len(stamps) - 1)
+            if gap is not None:
+                gap = max(gap, 60)
+                st["gap"] = gap if st["gap"] is None else self.SMOOTHING * gap + (1 - self.SMOOTHING) * st["gap"]
+                st["interval"] = st["gap"] * self.POLL_FRACTION
+            st["newest_ts"] = max(st["newest_ts"], stamps[-1])
+        elif not new_entry_timestamps:
+            st["interval"] = st["interval"] * self.BACKOFF
+
+        st["interval"] = min(max(st["interval"], self.min_interval), self.max_interval)
+        st["last_polled"] = now
+
+    def save(self):
+        if not self.state_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            # Drop feeds that were removed from the config
+            state = {url: st for url, st in self.state.items() if url in self.feeds}
+            with open(self.state_file, 'w') as f:
+                json.dump(state, f)
+        except Exception as e:
+            print(f"Error saving feed schedule {self.state_file}: {e}")
+
+    def _interval(self, url: str) -> float:
+        return self.state.get(url, {}).get("interval", self.default_interval)
+
+    def _next_poll(self, url: str) -> float:
+        st = self.state.get(url)
+        if not st or "last_polled" not in st:
+            return 0
+        return st["last_polled"] + st["interval"]
+
+    def _load_state(self) -> Dict:
+        if self.state_file and os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f: return json.load(f)
+            except: return {}
+        return {}
@@ -0,0 +1,133 @@
+import copy
+import time
+import xml.etree.ElementTree as ET
+from typing import List, Dict
+from urllib.parse import urljoin
+from feedparser.sanitizer import _sanitize_html
+from feedparser.urls import resolve_relative_uris
+from .timestamps import parse_timestamp
+
+class FeedStreamParser:
+    """
+    Incremental RSS 2.0 / RSS 1.0 / Atom parser.
+    Bytes are fed as they arrive and finished entries are returned right away,
+    their elements are dropped afterwards so a large feed is never held in memory.
+    Entries are plain dicts using feedparser's key names and values: HTML
+    bodies go through feedparser's own relative-URL and sanitizing steps, so an
+    item hashes the same whichever path parsed it.
+    """
+    ENTRY_TAGS = {"item", "entry"}
+    ATOM_NAMESPACES = ("{http://www.w3.org/2005/Atom}", "{http://purl.org/atom/ns#}")
+    # Atom type attribute -> MIME type; anything else is already a MIME type
+    ATOM_TYPES = {"text": "text/plain", "plain": "text/plain", "html": "text/html", "xhtml": "application/xhtml+xml"}
+    HTML_TYPES = {"text/html", "application/xhtml+xml"}
+
+    def __init__(self, base_url: str = ""):
+        self.base_url = base_url
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack = []
+
+    def feed(self, chunk: bytes) -> List[Dict]:
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[Dict]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[Dict]:
+        entries = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._stack.append(elem)
+                continue
+            self._stack.pop()
+            if self._local(elem.tag) in self.ENTRY_TAGS:
+                entries.append(self._to_entry(elem))
+                elem.clear()
+                if self._stack:
+                    self._stack[-1].remove(elem)
+        return entries
+
+    def _to_entry(self, elem) -> Dict:
+        fields = {}
+        link = ""
+        for child in elem:
+            name = self._local(child.tag)
+            if name == "link":
+                # Atom links carry the URL in href; prefer rel="alternate"
+                href = child.get("href")
+                if href is None:
+                    link = link or (child.text or "").strip()
+                elif child.get("rel", "alternate") == "alternate" or not link:
+                    link = href
+            elif name not in fields:
+                fields[name] = child
+
+        def text(*names) -> str:
+            return next((value for value in ((fields[n].text or "").strip() for n in names if n in fields) if value), "")
+
+        # Like feedparser: a description/summary wins even when empty; content only stands in for a text or HTML one
+        body = next((fields[n] for n in ("description", "summary") if n in fields), None)
+        if body is None:
+            body = next((fields[n] for n in ("content", "encoded") if n in fields
+                         and self._content_type(fields[n]) in self.HTML_TYPES | {"text/plain"}), None)
+        summary = self._body(body) if body is not None else ""
+        guid = text("guid", "id")
+        # Like feedparser: a permalink guid is a URL relative to the feed and stands in for a missing link
+        guid_elem = fields.get("guid", fields.get("id"))
+        if guid and guid_elem.get("isPermaLink", "true") == "true":
+            guid = urljoin(self.base_url, guid)
+            link = link or guid
+
+        entry = {
+            "title": text("title"),
+            "summary": summary,
+            "description": summary,
+            "published": text("pubDate", "published"),
+            "updated": text("date", "updated"),
+            "link": urljoin(self.base_url, link) if link else "",
+            "id": guid
+        }
+        for key in ("published", "updated"):
+            ts = parse_timestamp(entry[key])
+            if ts:
+                entry[key + "_parsed"] = time.gmtime(ts)
+        return entry
+
+    def _body(self, elem) -> str:
+        content_type = self._content_type(elem)
+        if content_type == "application/xhtml+xml":
+            body = self._inner_xhtml(elem)
+        else:
+            body = (elem.text or "").strip()
+        if body and content_type in self.HTML_TYPES:
+            body = resolve_relative_uris(body, self.base_url, "utf-8", content_type)
+            body = _sanitize_html(body, "utf-8", content_type)
+        return body
+
+    def _content_type(self, elem) -> str:
+        # RSS bodies are HTML; Atom ones say what they are and default to plain text
+        if not elem.tag.startswith(self.ATOM_NAMESPACES):
+            return "text/html"
+        content_type = elem.get("type", "text").lower()
+        return self.ATOM_TYPES.get(content_type, content_type)
+
+    def _inner_xhtml(self, elem) -> str:
+        # Atom xhtml content wraps its markup in a <div>, which feedparser leaves out
+        if len(elem) == 1 and self._local(elem[0].tag) == "div" and not (elem.text or "").strip():
+            elem = elem[0]
+        parts = [elem.text or ""]
+        for child in elem:
+            child = copy.deepcopy(child)
+            for node in child.iter():
+                node.tag = self._local(node.tag)
+            parts.append(ET.tostring(child, encoding="unicode"))
+        return "".join(parts).strip()
+
+    @staticmethod
+    def _local(tag) -> str:
+        # Strip the "{namespace}" prefix ElementTree puts on tags
+        if not isinstance(tag, str):
+            return ""
+        return tag.rsplit("}", 1)[-1]
@@ -0,0 +1,62 @@
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a keyword list: one pass over the text finds
+    every keyword occurrence, however many keywords there are. Matching is
+    case-insensitive and substring-based, like `kw in text.lower()`.
+    """
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(kw.lower() for kw in keywords if kw))
+        # State 0 is the root; per state: full transition table and indices of the keywords ending there
+        self._delta: List[Dict[str, int]] = []
+        self._out: List[Tuple[int, ...]] = [()]
+        self._build()
+
+    def find_all(self, text: str) -> List[Tuple[str, int]]:
+        """Every (keyword, start offset) in text, in order of where the keyword ends."""
+        hits = []
+        delta, out, keywords = self._delta, self._out, self.keywords
+        state = 0
+        for i, ch in enumerate(text.lower()):
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                for k in out[state]:
+                    hits.append((keywords[k], i - len(keywords[k]) + 1))
+        return hits
+
+    def contains_any(self, text: str) -> bool:
+        """Stops at the first match."""
+        delta, out = self._delta, self._out
+        state = 0
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                return True
+        return False
+
+    def _build(self):
+        goto = [{}]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                if ch not in goto[state]:
+                    goto.append({})
+                    self._out.append(())
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            self._out[state] += (index,)
+
+        # Breadth-first, so a state's failure target is complete before its children copy from it.
+        # Folding the failure links into the transitions gives a DFA: one dict lookup per character.
+        fail = [0] * len(goto)
+        self._delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self._out[state] += self._out[fail[state]] if fail[state] else ()
+            self._delta[state] = {**self._delta[fail[state]], **goto[state]}
+            for ch, child in goto[state].items():
+                fail[child] = self._delta[fail[state]].get(ch, 0) if state else 0
+                queue.append(child)
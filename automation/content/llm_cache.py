@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+class LLMCache:
+    """
+    On-disk cache of LLM responses, one file per entry named by the SHA-256 of
+    (model, prompt, generation config). Identical requests from reruns,
+    retries or repeated calls are answered without spending quota.
+
+    Entries expire after ttl seconds. A hit refreshes the file's mtime, so
+    once the directory passes max_entries the least recently used files are
+    removed first. Use LLMCache.shared() so every client in the process uses
+    the same instance.
+    """
+    DEFAULT_DIR = "automation/storage/cache/llm"
+    _instances = {}
+
+    def __init__(self, directory: str = DEFAULT_DIR, ttl: float = 86400, max_entries: int = 1000):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    @classmethod
+    def shared(cls, directory: str = DEFAULT_DIR) -> "LLMCache":
+        if directory not in cls._instances:
+            cls._instances[directory] = cls(directory)
+        return cls._instances[directory]
+
+    @staticmethod
+    def key(model_id: str, prompt: str, config=None) -> str:
+        if hasattr(config, "model_dump"):
+            # google.genai config types are pydantic models
+            config = config.model_dump(exclude_none=True)
+        payload = json.dumps([model_id, prompt, config], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                response = json.load(f)["response"]
+            os.utime(path)
+            return response
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable LLM cache entry {path}: {e}")
+            return None
+
+    def put(self, key: str, model_id: str, response: str):
+        if not response:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump({"model": model_id, "response": response}, f, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+            self._evict()
+        except Exception as e:
+            print(f"Error saving LLM cache entry {path}: {e}")
+
+    def _evict(self):
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        cutoff = time.time() - self.ttl
+        expired = sum(1 for e in entries if e.stat().st_mtime < cutoff)
+        for entry in entries[:max(len(entries) - self.max_entries, expired)]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import random
+import time
+from typing import AsyncIterator, Optional
+from google import genai
+from .llm_cache import LLMCache
+from .provider_router import ProviderRouter
+
+class AsyncLLMClient:
+    """
+    LLM client shared by the script writers. Requests go through a
+    ProviderRouter over Gemini and, when GROQ_API_KEY is set, Groq: a failing
+    provider is skipped by its circuit breaker and a slow one is hedged.
+    Everything is awaited: backoff uses asyncio.sleep, so TTS, media fetches
+    and other prompts keep running while one waits, and a semaphore per
+    provider caps how many requests are in flight at once.
+
+    A slot is held only while a request is running, never while backing off.
+    Cancelling a caller cancels its HTTP requests and frees the slots.
+
+    Responses are cached on disk by (model, prompt, config); pass
+    use_cache=False for prompts that must come out different every time.
+    """
+    GROQ_MODEL = "llama-3.3-70b-versatile"
+    LONG_PROMPT_CHARS = 4000  # Prompts this long go to the "long" latency bucket even without long_output
+    _instances = {}
+
+    def __init__(self, api_key: str, model_id: str = 'gemini-2.0-flash', max_concurrency: int = 4,
+                 max_retries: int = 5, timeout: float = 120, cache: LLMCache = None,
+                 router: ProviderRouter = None):
+        self.client = genai.Client(api_key=api_key)
+        self.cache = cache or LLMCache.shared()
+        self.model_id = model_id
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.groq_client = None
+        groq_api_key = os.getenv("GROQ_API_KEY")
+        if groq_api_key:
+            try:
+                from groq import AsyncGroq
+                self.groq_client = AsyncGroq(api_key=groq_api_key)
+            except ImportError:
+                pass
+        self._semaphores = {"gemini": asyncio.Semaphore(max_concurrency), "groq": asyncio.Semaphore(max_concurrency)}
+        self.router = router or ProviderRouter()
+        self.router.add("gemini", self._call_gemini)
+        if self.groq_client:
+            self.router.add("groq", self._call_groq)
+
+    @classmethod
+    def shared(cls, api_key: str) -> "AsyncLLMClient":
+        """One client per key, so every writer in the process shares the concurrency limit."""
+        if api_key not in cls._instances:
+            cls._instances[api_key] = cls(api_key)
+        return cls._instances[api_key]
+
+    async def generate(self, prompt: str, model_id: str = None, config=None, max_retries: int = None,
+                       use_cache: bool = True, long_output: bool = False) -> Optional[str]:
+        """
+        Returns the stripped response text, or None once every attempt failed.
+        `config` is passed through to Gemini (e.g. types.GenerateContentConfig).
+        Set long_output for prompts that ask for a long answer (full scripts,
+        batches), so their latency is judged against other long requests.
+        """
+        model_id = model_id or self.model_id
+        bucket = self._bucket(prompt, long_output)
+        if not use_cache:
+            return await self._generate(prompt, model_id, config, max_retries or self.max_retries, bucket)
+
+        key = self.cache.key(model_id, prompt, config)
+        cached = self.cache.get(key)
+        if cached is not None:
+            print("LLM cache hit")
+            return cached
+        result = await self._generate(prompt, model_id, config, max_retries or self.max_retries, bucket)
+        self.cache.put(key, model_id, result)
+        return result
+
+    async def stream(self, prompt: str, model_id: str = None, config=None, use_cache: bool = True,
+                     long_output: bool = False) -> AsyncIterator[str]:
+        """
+        Yields the response text as Gemini streams it. If Gemini's circuit is
+        open, or the stream fails before any text arrives, the whole answer
+        comes from generate() (router, retries) in one piece; a failure after
+        that is raised, since the text already yielded cannot be taken back.
+        The outcome counts towards Gemini's router stats, and a stream that
+        stalls for longer than `timeout` between chunks fails.
+        """
+        model_id = model_id or self.model_id
+        bucket = self._bucket(prompt, long_output)
+        key = self.cache.key(model_id, prompt, config)
+        cached = self.cache.get(key) if use_cache else None
+        if cached is not None:
+            print("LLM cache hit")
+            yield cached
+            return
+
+        parts = []
+        if not self.router.available("gemini"):
+            print("Gemini circuit open; requesting the full answer instead of streaming")
+            result = await self._generate(prompt, model_id, config, self.max_retries, bucket)
+            if result:
+                parts.append(result)
+                yield result
+        else:
+            start = time.monotonic()
+            try:
+                async with self._semaphores["gemini"]:
+                    response = await asyncio.wait_for(
+                        self.client.aio.models.generate_content_stream(model=model_id, contents=prompt, config=config),
+                        timeout=self.timeout
+                    )
+                    chunks = aiter(response)
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(anext(chunks), timeout=self.timeout)
+                        except StopAsyncIteration:
+                            break
+                        if chunk.text:
+                            parts.append(chunk.text)
+                            yield chunk.text
+                if not parts:
+                    raise ValueError("gemini streamed an empty response")
+                self.router.record("gemini", time.monotonic() - start, True, bucket)
+            except Exception as e:
+                self.router.record("gemini", time.monotonic() - start, False, bucket)
+                if parts:
+                    raise
+                print(f"LLM stream failed before any text: {e}. Falling back to a full request...")
+                result = await self._generate(prompt, model_id, config, self.max_retries, bucket)
+                if result:
+                    parts.append(result)
+                    yield result
+        if parts and use_cache:
+            self.cache.put(key, model_id, "".join(parts).strip())
+
+    async def _generate(self, prompt: str, model_id: str, config, max_retries: int, bucket: str = "short") -> Optional[str]:
+        for attempt in range(max_retries):
+            try:
+                return await self.router.call(prompt, model_id, config, bucket=bucket)
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    wait_time = (2 ** attempt) + random.uniform(0, 1)
+                    print(f"LLM Error: {e}. Retrying in {wait_time:.2f} seconds... (Attempt {attempt+1}/{max_retries})")
+                    await asyncio.sleep(wait_time)
+                else:
+                    print(f"CRITICAL: LLM failed after {max_retries} attempts. Last error: {e}")
+        return None
+
+    def _bucket(self, prompt: str, long_output: bool) -> str:
+        return "long" if long_output or len(prompt) >= self.LONG_PROMPT_CHARS else "short"
+
+    async def _call_gemini(self, prompt: str, model_id: str, config) -> str:
+        async with self._semaphores["gemini"]:
+            response = await asyncio.wait_for(
+                self.client.aio.models.generate_content(model=model_id, contents=prompt, config=config),
+                timeout=self.timeout
+            )
+        return (response.text or "").strip()
+
+    async def _call_groq(self, prompt: str, model_id: str = None, config=None) -> str:
+        # Groq serves its own model whatever Gemini model was asked for
+        async with self._semaphores["groq"]:
+            chat_completion = await asyncio.wait_for(
+                self.groq_client.chat.completions.create(
+                    messages=[{"role": "user", "content": prompt}],
+                    model=self.GROQ_MODEL,
+                ),
+                timeout=self.timeout
+            )
+        return (chat_completion.choices[0].message.content or "").strip()
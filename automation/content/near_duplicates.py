@@ -0,0 +1,145 @@
+import os
+import re
+import time
+import zlib
+from typing import Dict, List, Optional
+import numpy as np
+
+class NearDuplicateIndex:
+    """
+    Finds stories that several outlets published with different wording.
+    Each item gets a MinHash signature over character shingles of its
+    normalized headline + content (character shingles suit Devanagari, where
+    word splits and spellings vary between outlets). Signatures are bucketed by
+    LSH bands, so a lookup only compares against items sharing a band; a
+    candidate is a duplicate when its estimated Jaccard similarity reaches
+    `threshold`.
+
+    Entries come in two kinds: queued (accepted this run, kept in memory) and
+    posted (persisted to `path` and expired after max_age_days).
+    """
+    PRIME = (1 << 31) - 1  # Keeps a * x + b inside uint64
+    SEED = 20240601        # Fixed so signatures stay comparable across runs
+
+    def __init__(self, path: str = None, threshold: float = 0.4, num_perm: int = 128,
+                 shingle_size: int = 4, max_age_days: float = 3):
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_age = max_age_days * 86400
+        rng = np.random.default_rng(self.SEED)
+        self._a = rng.integers(1, self.PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, self.PRIME, size=num_perm, dtype=np.uint64)
+        self.bands, self.rows = self._choose_bands(num_perm, threshold)
+        # key -> {"signature", "ts", "posted"}
+        self.entries: Dict[str, Dict] = {}
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self._load()
+
+    def signature(self, item: Dict) -> Optional[np.ndarray]:
+        """MinHash signature of an item's headline + content, None if it has no text."""
+        shingles = self._shingles(f"{item.get('headline', '')} {item.get('content', '')}")
+        if not len(shingles):
+            return None
+        hashes = (self._a[:, None] * shingles[None, :] + self._b[:, None]) % self.PRIME
+        return hashes.min(axis=1).astype(np.uint32)
+
+    def find(self, signature: Optional[np.ndarray], include_posted: bool = True) -> Optional[str]:
+        """Key of the most similar entry at or above the threshold, else None."""
+        if signature is None:
+            return None
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        best, best_score = None, self.threshold
+        for key in candidates:
+            entry = self.entries[key]
+            if entry["posted"] and not include_posted:
+                continue
+            score = float(np.mean(entry["signature"] == signature))
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    def add(self, key: str, signature: Optional[np.ndarray], posted: bool = False, ts: float = None):
+        if signature is None or key in self.entries:
+            return
+        self.entries[key] = {"signature": signature, "ts": int(ts or time.time()), "posted": posted}
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def mark_posted(self, key: str):
+        if key in self.entries:
+            self.entries[key]["posted"] = True
+
+    def clear_queued(self):
+        """Forgets entries that were queued but never posted, e.g. after a failed render."""
+        posted = [(key, e) for key, e in self.entries.items() if e["posted"]]
+        if len(posted) == len(self.entries):
+            return
+        self.entries = {}
+        self._buckets = [{} for _ in range(self.bands)]
+        for key, e in posted:
+            self.add(key, e["signature"], posted=True, ts=e["ts"])
+
+    def save(self):
+        """Persists the posted entries that have not expired; queued ones die with the run."""
+        if not self.path:
+            return
+        cutoff = time.time() - self.max_age
+        kept = [(key, e) for key, e in self.entries.items() if e["posted"] and e["ts"] >= cutoff]
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            signatures = np.stack([e["signature"] for _, e in kept]) if kept else np.zeros((0, self.num_perm), np.uint32)
+            # np.savez appends .npz to names without it; write through a file object to keep our name
+            with open(self.path + ".tmp", 'wb') as f:
+                np.savez(f, keys=np.array([key for key, _ in kept]), ts=np.array([e["ts"] for _, e in kept], dtype=np.int64),
+                         signatures=signatures)
+            os.replace(self.path + ".tmp", self.path)
+        except Exception as e:
+            print(f"Error saving near-duplicate index {self.path}: {e}")
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                keys, stamps, signatures = data["keys"], data["ts"], data["signatures"]
+        except Exception as e:
+            print(f"Ignoring unreadable near-duplicate index {self.path}: {e}")
+            return
+        if signatures.shape[1:] != (self.num_perm,):
+            print(f"Near-duplicate index {self.path} was built with other settings; starting fresh")
+            return
+        cutoff = time.time() - self.max_age
+        for key, ts, signature in zip(keys, stamps, signatures):
+            if ts >= cutoff:
+                self.add(str(key), signature, posted=True, ts=int(ts))
+
+    def _shingles(self, text: str) -> np.ndarray:
+        text = re.sub(r'<[^>]+>', ' ', text.lower())
+        # Letters, marks and digits only: punctuation and danda differ between outlets
+        text = " ".join(re.sub(r'[^\w\u0900-\u0963\u0966-\u097F]+', ' ', text).split())
+        k = self.shingle_size
+        if len(text) < k:
+            return np.zeros(0, dtype=np.uint64)
+        shingles = {text[i:i + k] for i in range(len(text) - k + 1)}
+        return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        r = self.rows
+        return [signature[band * r:(band + 1) * r].tobytes() for band in range(self.bands)]
+
+    @staticmethod
+    def _choose_bands(num_perm: int, threshold: float, recall: float = 0.99):
+        """
+        Picks bands x rows = num_perm so that a pair exactly at the threshold
+        shares a bucket with probability >= recall, 1 - (1 - s^rows)^bands.
+        That puts the S-curve, (1/bands)^(1/rows), below the threshold; among
+        those splits the one with the most rows is taken, as it lets the
+        fewest dissimilar items through to the exact signature comparison.
+        """
+        options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+        return max((br for br in options if 1 - (1 - threshold ** br[1]) ** br[0] >= recall),
+                   key=lambda br: br[1], default=(num_perm, 1))
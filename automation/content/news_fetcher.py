@@ -1,45 +1,401 @@
+import asyncio
+import calendar
 import feedparser
 import hashlib
-from typing import List, Dict
+import json
+import os
+import re
+import aiohttp
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, AsyncIterator
+from urllib.parse import urlparse
+from .feed_stream import FeedStreamParser
+from .timestamps import parse_timestamp
 
 class RSSFetcher:
-    def __init__(self, feeds: List[str]):
+    USER_AGENT = "Mozilla/5.0 (compatible; NepalNowBot/1.0; +https://www.youtube.com)"
+
+    def __init__(self, feeds: List[str], timeout: float = 15, host_timeouts: Dict[str, float] = None,
+                 max_connections: int = 10, parse_workers: int = 4, cache_file: str = None,
+                 cursor_file: str = None, scheduler=None):
         self.feeds = feeds
+        self.timeout = timeout
+        # Per-host overrides, e.g. {"ratopati.com": 25}. "www." is ignored when matching.
+        self.host_timeouts = {self._strip_www(h): t for h, t in (host_timeouts or {}).items()}
+        self.max_connections = max_connections
+        self._parse_pool = ThreadPoolExecutor(max_workers=parse_workers, thread_name_prefix="feed-parse")
+        self._session = None
+        # Conditional-GET validators and last parsed items per feed URL
+        self.cache_file = cache_file
+        self.feed_cache = self._load_cache()
+        # Per-feed high-water marks: newest published timestamp and the guids seen with it
+        self.cursor_file = cursor_file
+        self.cursors = self._load_json(cursor_file)
+        self._pending_cursors = {}
+        # Optional FeedScheduler: the streaming fetch only polls feeds that are due
+        self.scheduler = scheduler
 
-    def fetch_all(self) -> List[Dict]:
+    def fetch_all(self, replay: bool = False) -> List[Dict]:
+        """
+        Fetches every feed. When a cursor file is configured only entries newer
+        than each feed's cursor are returned, unless replay=True.
+        """
         all_news = []
         for url in self.feeds:
             try:
-                feed = feedparser.parse(url)
-                for entry in feed.entries:
-                    headline = entry.get("title", "")
-                    news_item = {
-                        "headline": headline,
-                        "content": entry.get("summary", "") or entry.get("description", ""),
-                        "source": url,
-                        "published_time": entry.get("published", ""),
-                        "url": entry.get("link", "")
-                    }
-                    news_item["hash"] = self._generate_hash(news_item)
-                    news_item["headline_hash"] = self._generate_headline_hash(headline)
-                    all_news.append(news_item)
+                all_news.extend(self._apply_cursor(url, self._fetch_feed(url), replay))
             except Exception as e:
                 print(f"Error fetching {url}: {e}")
+        self._save_cache()
+        return all_news
+
+    async def fetch_all_async(self, replay: bool = False) -> List[Dict]:
+        """
+        Downloads every feed concurrently over a pooled HTTP session and parses
+        the bodies on a worker pool, so ingest time follows the slowest feed.
+        Returns the same item dicts as fetch_all().
+        """
+        session = await self._get_session()
+        results = await asyncio.gather(*(self._fetch_feed_async(session, url) for url in self.feeds))
+        all_news = []
+        for url, items in zip(self.feeds, results):
+            all_news.extend(self._apply_cursor(url, items, replay))
+        self._save_cache()
         return all_news
 
-    def _generate_hash(self, item: Dict) -> str:
+    def fetch_iter(self, replay: bool = False) -> Iterator[Dict]:
+        """
+        Generator version of fetch_all(): yields items as they are parsed instead
+        of building one list. Drives fetch_iter_async() on a private event loop,
+        so it must not be called from async code.
+        """
+        loop = asyncio.new_event_loop()
+        outer_session, self._session = self._session, None
+        items = self.fetch_iter_async(replay)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(items.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(items.aclose())
+            loop.run_until_complete(self.close())
+            loop.close()
+            self._session = outer_session
+
+    async def fetch_iter_async(self, replay: bool = False, queue_size: int = 256,
+                               urls: List[str] = None) -> AsyncIterator[Dict]:
+        """
+        Downloads every feed concurrently and yields normalized items as soon as
+        they are parsed from the incoming bytes. Feeds are parsed incrementally, and
+        the bounded queue makes producers wait when the consumer falls behind.
+        Leaving the loop early cancels the downloads still in flight.
+        With a scheduler and no explicit urls, only the feeds that are due are polled.
+        """
+        if urls is None:
+            urls = self.scheduler.due_feeds() if self.scheduler and not replay else self.feeds
+        if self.scheduler:
+            print(f"Polling {len(urls)}/{len(self.feeds)} feeds due now.")
+        session = await self._get_session()
+        queue = asyncio.Queue(maxsize=queue_size)
+        finished = object()
+
+        async def produce(url):
+            async for item in self._stream_feed_async(session, url, replay):
+                await queue.put(item)
+            await queue.put(finished)
+
+        tasks = [asyncio.create_task(produce(url)) for url in urls]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if item is finished:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._save_cache()
+
+    def parse_pushed(self, url: str, body: bytes) -> List[Dict]:
+        """
+        Turns a feed payload pushed by a WebSub hub into items, filtered by and
+        merged into the feed's cursor so the polling fallback does not repeat them.
+        """
+        items = self._parse_feed(body, url)
+        # Pushes can arrive faster than cursors are committed, so uncommitted ones count too
+        is_new = self._cursor_filter(url, include_pending=True)
+        new_items = [item for item in items if is_new(item)]
+        if self.cursor_file and items:
+            # A push carries only part of the feed, so extend the window instead of replacing it
+            cursor = self._pending_cursors.get(url) or self.cursors.get(url) or {}
+            guids = [item["guid"] for item in items] + cursor.get("guids", [])
+            self._pending_cursors[url] = {
+                "published_ts": max([cursor.get("published_ts", 0)] + [item.get("published_ts", 0) for item in items]),
+                "guids": list(dict.fromkeys(guids))[:500]
+            }
+        return new_items
+
+    def commit_cursors(self):
+        """
+        Persists the cursors advanced by the last fetch. Kept separate from the
+        fetch so a failed or test run does not hide entries from the next one.
+        Entries a successful run fetched but did not use are carried over by
+        the news pipeline's BreakingBacklog, not by the cursor.
+        """
+        if not self.cursor_file or not self._pending_cursors:
+            return
+        self.cursors.update(self._pending_cursors)
+        self._pending_cursors = {}
+        self._save_json(self.cursor_file, self.cursors)
+
+    def reset_cursors(self, urls: List[str] = None):
+        """Forgets the cursors of the given feeds (all feeds by default) so they replay in full."""
+        for url in (urls or list(self.cursors)):
+            self.cursors.pop(url, None)
+            self._pending_cursors.pop(url, None)
+        if self.cursor_file:
+            self._save_json(self.cursor_file, self.cursors)
+
+    def _apply_cursor(self, url: str, items: List[Dict], replay: bool = False) -> List[Dict]:
+        if not self.cursor_file:
+            return items
+        is_new = self._cursor_filter(url, replay)
+        self._advance_cursor(url, items)
+        return [item for item in items if is_new(item)]
+
+    def _cursor_filter(self, url: str, replay: bool = False, include_pending: bool = False):
+        cursor = (include_pending and self._pending_cursors.get(url)) or self.cursors.get(url)
+        if not self.cursor_file or not cursor or replay:
+            return lambda item: True
+        seen = set(cursor.get("guids", []))
+        high_water = cursor.get("published_ts", 0)
+        return lambda item: (
+            item.get("guid") not in seen
+            and (not item.get("published_ts") or item["published_ts"] >= high_water)
+        )
+
+    def _advance_cursor(self, url: str, items: List[Dict]):
+        if not self.cursor_file or not items:
+            return
+        cursor = self.cursors.get(url)
+        previous = cursor.get("published_ts", 0) if cursor else 0
+        self._pending_cursors[url] = {
+            "published_ts": max([previous] + [item.get("published_ts", 0) for item in items]),
+            # The current feed window is enough: entries that fell out of it do not come back
+            "guids": [item.get("guid") for item in items][:500]
+        }
+
+    async def close(self):
+        """Closes the pooled HTTP session opened by the async fetch methods."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=2, ttl_dns_cache=600)
+            self._session = aiohttp.ClientSession(connector=connector, headers={"User-Agent": self.USER_AGENT})
+        return self._session
+
+    def _fetch_feed(self, url: str) -> List[Dict]:
+        cached = self.feed_cache.get(url, {})
+        feed = feedparser.parse(url, etag=cached.get("etag"), modified=cached.get("last_modified"))
+        if feed.get("status") == 304 and "items" in cached:
+            return [dict(item) for item in cached["items"]]
+        items = [self._normalize_entry(entry, url) for entry in feed.entries]
+        self._update_cache(url, feed.get("etag"), feed.get("modified"), items)
+        return items
+
+    def _conditional_headers(self, url: str) -> Dict:
+        cached = self.feed_cache.get(url, {})
+        headers = {}
+        if "items" in cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    async def _stream_feed_async(self, session: aiohttp.ClientSession, url: str, replay: bool = False) -> AsyncIterator[Dict]:
+        timeout = self._timeout_for(url)
+        cached = self.feed_cache.get(url, {})
+        is_new = self._cursor_filter(url, replay)
+        # Only the small normalized items are kept, for the cursor and the 304 cache
+        items = []
+        try:
+            async with session.get(url, headers=self._conditional_headers(url),
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status == 304:
+                    items = [dict(item) for item in cached["items"]]
+                    for item in items:
+                        if is_new(item):
+                            yield item
+                elif response.status != 200:
+                    print(f"Error fetching {url}: HTTP {response.status}")
+                    return
+                else:
+                    parser = FeedStreamParser(base_url=url)
+                    try:
+                        async for chunk in response.content.iter_chunked(64 * 1024):
+                            for entry in parser.feed(chunk):
+                                item = self._normalize_entry(entry, url)
+                                items.append(item)
+                                if is_new(item):
+                                    yield item
+                        for entry in parser.close():
+                            item = self._normalize_entry(entry, url)
+                            items.append(item)
+                            if is_new(item):
+                                yield item
+                    except ET.ParseError as e:
+                        # Not well-formed XML; let feedparser's forgiving parser have the whole body
+                        print(f"Streaming parse failed for {url} ({e}), falling back to feedparser")
+                        yielded = {item["guid"] for item in items if is_new(item)}
+                        items = await self._fetch_feed_async(session, url)
+                        for item in items:
+                            if item["guid"] not in yielded and is_new(item):
+                                yield item
+                        self._advance_cursor(url, items)
+                        return
+                    self._update_cache(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), items)
+            self._advance_cursor(url, items)
+            if self.scheduler:
+                self.scheduler.record(url, [item.get("published_ts", 0) for item in items if is_new(item)])
+        except asyncio.TimeoutError:
+            print(f"Timed out fetching {url} after {timeout}s")
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+
+    async def _fetch_feed_async(self, session: aiohttp.ClientSession, url: str) -> List[Dict]:
+        timeout = self._timeout_for(url)
+        cached = self.feed_cache.get(url, {})
+        try:
+            async with session.get(url, headers=self._conditional_headers(url),
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status == 304:
+                    # Unchanged since the last poll: reuse the parsed items, skip download and parse
+                    return [dict(item) for item in cached["items"]]
+                if response.status != 200:
+                    print(f"Error fetching {url}: HTTP {response.status}")
+                    return []
+                body = await response.read()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+            loop = asyncio.get_running_loop()
+            items = await loop.run_in_executor(self._parse_pool, self._parse_feed, body, url)
+            self._update_cache(url, etag, last_modified, items)
+            return items
+        except asyncio.TimeoutError:
+            print(f"Timed out fetching {url} after {timeout}s")
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+        return []
+
+    def _parse_feed(self, source, url: str) -> List[Dict]:
+        # `source` is the downloaded body; content-location makes relative links
+        # resolve against the feed URL, exactly as when feedparser downloads it
+        feed = feedparser.parse(source, response_headers={"content-location": url})
+        return [self._normalize_entry(entry, url) for entry in feed.entries]
+
+    def _normalize_entry(self, entry, url: str) -> Dict:
+        headline = entry.get("title", "")
+        published = entry.get("published", "") or entry.get("updated", "")
+        published_parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        news_item = {
+            "headline": headline,
+            "content": entry.get("summary", "") or entry.get("description", ""),
+            "source": url,
+            "published_time": entry.get("published", ""),
+            # Parsed once here so downstream stages compare integers, not date strings
+            "published_ts": calendar.timegm(published_parsed) if published_parsed else parse_timestamp(published),
+            "url": entry.get("link", "")
+        }
+        news_item["guid"] = entry.get("id") or news_item["url"] or self._generate_headline_hash(headline)
+        news_item["hash"] = self._generate_hash(news_item)
+        news_item["headline_hash"] = self._generate_headline_hash(headline)
+        return news_item
+
+    def _update_cache(self, url: str, etag: str, last_modified: str, items: List[Dict]):
+        if not self.cache_file:
+            return
+        if etag or last_modified:
+            # Copies: downstream stages annotate the items they are handed (outlets, score)
+            self.feed_cache[url] = {"etag": etag, "last_modified": last_modified, "items": [dict(item) for item in items]}
+        else:
+            # Host does not support conditional requests, nothing worth keeping
+            self.feed_cache.pop(url, None)
+
+    def _load_cache(self) -> Dict:
+        return self._load_json(self.cache_file)
+
+    def _save_cache(self):
+        if not self.cache_file:
+            return
+        # Only keep feeds that are still configured
+        cache = {url: entry for url, entry in self.feed_cache.items() if url in self.feeds}
+        self._save_json(self.cache_file, cache)
+
+    @staticmethod
+    def _load_json(path: str) -> Dict:
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Ignoring unreadable fetcher state {path}: {e}")
+        return {}
+
+    @staticmethod
+    def _save_json(path: str, data: Dict):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving fetcher state {path}: {e}")
+
+    def _timeout_for(self, url: str) -> float:
+        host = self._strip_www(urlparse(url).hostname or "")
+        return self.host_timeouts.get(host, self.timeout)
+
+    @staticmethod
+    def _strip_www(host: str) -> str:
+        host = host.lower()
+        return host[4:] if host.startswith("www.") else host
+
+    @classmethod
+    def complete_item(cls, item: Dict) -> Dict:
+        """
+        Fills in hash, headline_hash, guid and published_ts on items produced by
+        other sources (Telegram, DuckDuckGo) so they match the RSS item schema.
+        """
+        item.setdefault("hash", cls._generate_hash(item))
+        item.setdefault("headline_hash", cls._generate_headline_hash(item["headline"]))
+        item.setdefault("guid", item.get("url") or item["hash"])
+        item.setdefault("published_ts", parse_timestamp(item.get("published_time", "")))
+        return item
+
+    @staticmethod
+    def _generate_hash(item: Dict) -> str:
         content = f"{item['headline']}{item['content']}"
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
-    def _generate_headline_hash(self, headline: str) -> str:
-        normalized = self._normalize_headline(headline)
+    @classmethod
+    def _generate_headline_hash(cls, headline: str) -> str:
+        normalized = cls._normalize_headline(headline)
         return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
 
-    def _normalize_headline(self, headline: str) -> str:
+    @staticmethod
+    def _normalize_headline(headline: str) -> str:
         # Lowercase, remove extra spaces, remove common prefixes
         h = headline.lower().strip()
         # Remove anything in brackets
-        import re
         h = re.sub(r'\[.*?\]', '', h)
         h = re.sub(r'\(.*?\)', '', h)
         # Remove common separators
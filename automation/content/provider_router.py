@@ -0,0 +1,254 @@
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+class Provider:
+    """
+    One LLM backend and its recent (ts, latency, ok, bucket) samples, plus a circuit
+    breaker: when the error rate over the window reaches the threshold the
+    circuit opens and the provider is skipped for cooldown seconds. The first
+    call after that is a trial that closes the circuit on success or reopens
+    it on failure.
+
+    ok is None for a call cancelled after losing a hedge race: it counts as an
+    error, and its latency is censored at the hedge threshold it exceeded.
+    """
+    def __init__(self, name: str, call: Callable[..., Awaitable[str]], window: int, window_seconds: float):
+        self.name = name
+        self.call = call
+        self.window_seconds = window_seconds
+        self.samples = deque(maxlen=window)
+        self.opened_at: Optional[float] = None
+
+    def available(self, cooldown: float, now: float) -> bool:
+        return self.opened_at is None or now - self.opened_at >= cooldown
+
+    def record(self, latency: float, ok: Optional[bool], failure_threshold: float, min_samples: int, now: float,
+               bucket: str = "short"):
+        if self.opened_at is not None:
+            # Trial call after the cooldown decides the circuit
+            if ok:
+                print(f"LLM provider {self.name} recovered; closing circuit")
+                self.opened_at = None
+                self.samples.clear()
+            else:
+                self.opened_at = now
+                return
+        self.samples.append((now, latency, ok, bucket))
+        self._expire(now)
+        if not ok and len(self.samples) >= min_samples and self.error_rate() >= failure_threshold:
+            print(f"LLM provider {self.name} failing ({self.error_rate():.0%} errors); opening circuit")
+            self.opened_at = now
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for sample in self.samples if not sample[2]) / len(self.samples)
+
+    def latency_percentile(self, percentile: float, min_samples: int, bucket: str = "short") -> Optional[float]:
+        """
+        Latency of successful calls of the same size bucket at the given
+        percentile, or None with too few samples. Long answers take several
+        times longer than short ones, so mixing them would hedge every long request.
+        Lost hedge races count at the threshold they passed, so they keep the
+        slow tail in the estimate without ever pushing it up.
+        """
+        latencies = sorted(latency for _, latency, ok, b in self.samples if ok is not False and b == bucket)
+        if len(latencies) < min_samples:
+            return None
+        return latencies[min(len(latencies) - 1, math.ceil(percentile / 100 * len(latencies)) - 1)]
+
+    def _expire(self, now: float):
+        while self.samples and now - self.samples[0][0] > self.window_seconds:
+            self.samples.popleft()
+
+
+class ProviderRouter:
+    """
+    Sends each request to the first provider whose circuit is closed, in the
+    order they were added. If that provider is slower than its own
+    hedge_percentile latency, the request also goes to the next provider and
+    the first answer wins; the loser is cancelled. A failed provider hands the
+    request to the next one straight away instead of after a retry.
+
+    Stats survive between runs in a small JSON file, so a provider that was
+    failing in the previous scheduled run starts this one with its circuit open.
+    """
+    DEFAULT_PATH = "automation/storage/cache/llm_providers.json"
+
+    def __init__(self, path: str = DEFAULT_PATH, window: int = 50, window_seconds: float = 3600,
+                 failure_threshold: float = 0.5, min_samples: int = 4, cooldown: float = 300,
+                 hedge: bool = True, hedge_percentile: float = 90, min_hedge_delay: float = 2.0):
+        self.path = path
+        self.window = window
+        self.window_seconds = window_seconds
+        self.failure_threshold = failure_threshold
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.providers: List[Provider] = []
+        self._saved = self._load()
+
+    def add(self, name: str, call: Callable[..., Awaitable[str]]):
+        provider = Provider(name, call, self.window, self.window_seconds)
+        state = self._saved.get(name, {})
+        # Samples saved before size buckets existed have no bucket and are dropped
+        provider.samples.extend(tuple(sample) for sample in state.get("samples", []) if len(sample) == 4)
+        provider.opened_at = state.get("opened_at")
+        provider._expire(time.time())
+        self.providers.append(provider)
+
+    def available(self, name: str) -> bool:
+        """False while the named provider's circuit is open (or it is not configured)."""
+        now = time.time()
+        return any(p.name == name and p.available(self.cooldown, now) for p in self.providers)
+
+    def record(self, name: str, latency: float, ok: bool, bucket: str = "short"):
+        """Records a call made outside call() (e.g. a streamed response) in the provider's stats."""
+        for provider in self.providers:
+            if provider.name == name:
+                provider.record(latency, ok, self.failure_threshold, self.min_samples, time.time(), bucket)
+        self._save()
+
+    async def call(self, *args, bucket: str = "short") -> str:
+        """
+        Calls providers with *args until one returns text; raises the last error
+        if none does. `bucket` groups requests of similar expected duration
+        (e.g. "short"/"long") for the hedge threshold.
+        """
+        if not self.providers:
+            raise RuntimeError("No LLM providers configured")
+        now = time.time()
+        candidates = [p for p in self.providers if p.available(self.cooldown, now)]
+        if not candidates:
+            # Every circuit is open: try them all anyway, soonest to reopen first
+            candidates = sorted(self.providers, key=lambda p: p.opened_at)
+
+        tried: Set[str] = set()
+        last_error = None
+        try:
+            for provider in candidates:
+                if provider.name in tried:
+                    continue
+                backup = next((p for p in candidates if p is not provider and p.name not in tried), None)
+                try:
+                    return await self._race(provider, backup if self.hedge else None, args, tried, bucket)
+                except Exception as e:
+                    last_error = e
+            raise last_error
+        finally:
+            self._save()
+
+    async def _race(self, primary: Provider, backup: Optional[Provider], args, tried: Set[str], bucket: str) -> str:
+        tried.add(primary.name)
+        started = {}
+
+        def launch(provider: Provider) -> asyncio.Task:
+            task = asyncio.create_task(self._timed(provider, args, bucket))
+            started[task] = (provider, time.monotonic())
+            return task
+
+        tasks = {launch(primary)}
+        won = False
+        threshold = primary.latency_percentile(self.hedge_percentile, self.min_samples, bucket) if backup else None
+        try:
+            if threshold is not None:
+                delay = max(threshold, self.min_hedge_delay)
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    print(f"{primary.name} slower than its p{self.hedge_percentile:g} ({delay:.1f}s); hedging with {backup.name}")
+                    tried.add(backup.name)
+                    tasks.add(launch(backup))
+
+            last_error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        won = True
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+                provider, _ = started[task]
+                if won and provider is primary:
+                    # Slower than its threshold: an error for the breaker, so a hanging primary
+                    # opens its circuit, and a sample at the threshold so the hedge delay cannot creep up.
+                    # A cancelled backup only ran for part of the race and says nothing.
+                    provider.record(threshold, None, self.failure_threshold, self.min_samples, time.time(), bucket)
+
+    async def _timed(self, provider: Provider, args, bucket: str) -> str:
+        start = time.monotonic()
+        try:
+            result = await provider.call(*args)
+            if not result:
+                raise ValueError(f"{provider.name} returned an empty response")
+        except asyncio.CancelledError:
+            # Lost a hedge race (recorded by _race) or the caller gave up
+            raise
+        except Exception as e:
+            print(f"LLM provider {provider.name} failed: {e}")
+            provider.record(time.monotonic() - start, False, self.failure_threshold, self.min_samples, time.time(), bucket)
+            raise
+        provider.record(time.monotonic() - start, True, self.failure_threshold, self.min_samples, time.time(), bucket)
+        return result
+
+    def _load(self) -> Dict:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Ignoring unreadable provider stats {self.path}: {e}")
+        return {}
+
+    def _save(self):
+        state = {p.name: {"opened_at": p.opened_at, "samples": list(p.samples)} for p in self.providers}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(self.path + ".tmp", self.path)
+        except Exception as e:
+            print(f"Error saving provider stats {self.path}: {e}")
+
+
+if __name__ == "__main__":
+    # Self-check: a primary that starts hanging must not drag the hedge delay up with it
+    import tempfile
+
+    async def check():
+        hanging = False
+
+        async def primary(prompt):
+            await asyncio.sleep(3600 if hanging else 0.05)
+            return "primary"
+
+        async def backup(prompt):
+            await asyncio.sleep(0.03)
+            return "backup"
+
+        router = ProviderRouter(path=os.path.join(tempfile.mkdtemp(), "providers.json"), min_hedge_delay=0.01)
+        router.add("primary", primary)
+        router.add("backup", backup)
+        for _ in range(20):
+            await router.call("prompt")
+        hanging = True
+        latencies = []
+        for _ in range(120):
+            start = time.monotonic()
+            await router.call("prompt")
+            latencies.append(time.monotonic() - start)
+        assert router.providers[0].opened_at is not None, "hanging primary never opened its circuit"
+        assert max(latencies) < 0.2, f"hedge delay crept up to {max(latencies):.2f}s"
+        print(f"Hanging primary opened its circuit; slowest request {max(latencies):.3f}s")
+
+    asyncio.run(check())
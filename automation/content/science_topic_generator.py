@@ -1,28 +1,20 @@
-import json
-import os
 import random
 from typing import List
+from ..state.history_log import HistoryLog
+from ..state.fingerprint_store import FingerprintStore
 
 class ScienceTopicGenerator:
-    def __init__(self, history_file: str, topics: List[str]):
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, history_file: str, topics: List[str], seen: FingerprintStore = None):
         self.history_file = history_file
         self.topics = topics
-        self.history = self._load_history()
-
-    def _load_history(self) -> List[str]:
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except: return []
-        return []
-
-    def _save_history(self):
-        os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump(self.history, f, indent=2, ensure_ascii=False)
+        # Only the tail is read; last() feeds the "avoid repeating" prompt
+        self.history = HistoryLog(history_file)
+        # Shared posted fingerprints catch repeats older than the prompt's window
+        self.seen = seen
 
-    def get_next_topic(self, script_writer) -> str:
+    async def get_next_topic(self, script_writer) -> str:
         """
         Selects a topic and generates a specific sub-topic using LLM.
         """
@@ -35,14 +27,20 @@ class ScienceTopicGenerator:
         
         Rules:
         - Must be mind-blowing and true.
-        - Avoid repeating these previous topics: {", ".join(self.history[-10:])}
+        - Avoid repeating these previous topics: {", ".join(self.history.last(10))}
         - Output ONLY the sub-topic name (3-6 words).
         """
         
-        sub_topic = script_writer._call_with_retry(prompt)
-        # Clean sub_topic
-        sub_topic = sub_topic.replace('"', '').strip()
+        for attempt in range(self.MAX_ATTEMPTS):
+            # A cached answer would be the same topic again
+            sub_topic = await script_writer._call_with_retry(prompt, use_cache=False)
+            # Clean sub_topic
+            sub_topic = sub_topic.replace('"', '').strip()
+            if self.seen is None or sub_topic not in self.seen:
+                break
+            print(f"Topic already covered, asking again: {sub_topic}")
         
         self.history.append(sub_topic)
-        self._save_history()
+        if self.seen is not None:
+            self.seen.add(sub_topic)
         return sub_topic
@@ -1,61 +1,22 @@
-from google import genai
-from google.genai import errors
-import os
-import time
-import random
+import asyncio
 import json
 import re
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
+from .llm_client import AsyncLLMClient
 
 class ScriptWriter:
-    def __init__(self, api_key: str):
-        self.client = genai.Client(api_key=api_key)
-        self.model_id = 'gemini-2.0-flash'
-        self.groq_api_key = os.getenv("GROQ_API_KEY")
-        if self.groq_api_key:
-            try:
-                from groq import Groq
-                self.groq_client = Groq(api_key=self.groq_api_key)
-            except ImportError:
-                self.groq_client = None
-        else:
-            self.groq_client = None
-
-    def _call_with_retry(self, prompt: str, max_retries: int = 5) -> str:
+    BATCH_SIZE = 5  # Items per rewrite prompt; bigger bursts go out as parallel prompts
+
+    def __init__(self, api_key: str, llm: AsyncLLMClient = None):
+        self.llm = llm or AsyncLLMClient.shared(api_key)
+
+    async def _call_with_retry(self, prompt: str, max_retries: int = 5, use_cache: bool = True,
+                               long_output: bool = False) -> str:
         """Calls Gemini with exponential backoff, falling back to Groq if available."""
-        for attempt in range(max_retries):
-            try:
-                response = self.client.models.generate_content(
-                    model=self.model_id,
-                    contents=prompt
-                )
-                return response.text.strip()
-            except Exception as e:
-                err_msg = str(e).lower()
-                is_quota_error = "quota" in err_msg or "429" in err_msg or "exhausted" in err_msg
-                
-                if is_quota_error and self.groq_client:
-                    print(f"Gemini Quota Exceeded. Trying Groq fallback (Attempt {attempt+1})...")
-                    try:
-                        chat_completion = self.groq_client.chat.completions.create(
-                            messages=[{"role": "user", "content": prompt}],
-                            model="llama-3.3-70b-versatile",
-                        )
-                        result = chat_completion.choices[0].message.content.strip()
-                        if result: return result
-                    except Exception as groq_err:
-                        print(f"Groq fallback failed: {groq_err}")
-                
-                if attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) + random.uniform(0, 1)
-                    print(f"LLM Error: {e}. Retrying in {wait_time:.2f} seconds... (Attempt {attempt+1}/{max_retries})")
-                    time.sleep(wait_time)
-                else:
-                    print(f"CRITICAL: LLM failed after {max_retries} attempts. Last error: {e}")
-        
-        return "Error: Maximum retries reached for LLM generation."
+        result = await self.llm.generate(prompt, max_retries=max_retries, use_cache=use_cache, long_output=long_output)
+        return result if result is not None else "Error: Maximum retries reached for LLM generation."
 
-    def rewrite_for_shorts(self, headline: str, content: str) -> str:
+    async def rewrite_for_shorts(self, headline: str, content: str) -> str:
         prompt = f"""
         Rewrite this breaking news into a 25–40 second YouTube Shorts script in Nepali.
         Headline: {headline}
@@ -70,11 +31,72 @@ class ScriptWriter:
         - DO NOT include narrator labels.
         End with: 'थप अपडेटका लागि हामीसँगै रहनुहोला।'
         """
-        script = self._call_with_retry(prompt)
+        script = await self._call_with_retry(prompt)
         return self.clean_script(script)
 
-    def generate_science_facts(self, topic: str) -> str:
+    async def rewrite_batch(self, items: List[Dict]) -> List[str]:
+        """
+        Rewrites several breaking items with one prompt per BATCH_SIZE items,
+        returning scripts in the same order. Items missing from the JSON
+        answer (or the whole chunk, if it does not parse) are rewritten one by one.
+        """
+        if len(items) == 1:
+            return [await self.rewrite_for_shorts(items[0]['headline'], items[0]['content'])]
+        chunks = [items[i:i + self.BATCH_SIZE] for i in range(0, len(items), self.BATCH_SIZE)]
+        results = await asyncio.gather(*[self._rewrite_chunk(chunk) for chunk in chunks])
+        return [script for chunk_scripts in results for script in chunk_scripts]
+
+    async def _rewrite_chunk(self, items: List[Dict]) -> List[str]:
+        news_text = "\n\n".join([f"ID: {i}\nHeadline: {item['headline']}\nContent: {item['content']}" for i, item in enumerate(items)])
         prompt = f"""
+        Rewrite each of these breaking news items into its own 25–40 second YouTube Shorts script in Nepali.
+
+        News items:
+        {news_text}
+
+        Language: Nepali (Devanagari script)
+        Tone: Professional news anchor, formal, neutral.
+        Rules:
+        - Use standard Nepali news reporting grammar.
+        - Ensure natural flow and correct tense usage.
+        - Each script contains ONLY the Nepali speech text for its item.
+        - DO NOT include narrator labels.
+        - End every script with: 'थप अपडेटका लागि हामीसँगै रहनुहोला।'
+
+        Output Format: JSON list with one object per item, e.g.
+        [{{"id": 0, "script": "..."}}, {{"id": 1, "script": "..."}}]
+        RETURN ONLY THE JSON LIST.
+        """
+        response = await self._call_with_retry(prompt, long_output=True)
+        scripts = [None] * len(items)
+        try:
+            for entry in json.loads(self.clean_json_response(response)):
+                if not isinstance(entry, dict):
+                    continue
+                i, script = entry.get("id"), entry.get("script")
+                if isinstance(i, int) and 0 <= i < len(items) and isinstance(script, str) and script.strip():
+                    scripts[i] = self.clean_script(script)
+        except Exception as e:
+            print(f"Error parsing batch rewrite JSON: {e}")
+
+        missing = [i for i, script in enumerate(scripts) if script is None]
+        if missing:
+            print(f"Batch rewrite: rewriting {len(missing)} of {len(items)} items individually")
+            retried = await asyncio.gather(*[self.rewrite_for_shorts(items[i]['headline'], items[i]['content']) for i in missing])
+            for i, script in zip(missing, retried):
+                scripts[i] = script
+        return scripts
+
+    async def generate_science_facts(self, topic: str) -> str:
+        script = await self._call_with_retry(self._science_facts_prompt(topic))
+        return self.clean_script(script)
+
+    def stream_science_facts(self, topic: str) -> AsyncIterator[str]:
+        """generate_science_facts as raw text chunks while the model writes it (see TTSEngine.generate_audio_streamed)."""
+        return self.llm.stream(self._science_facts_prompt(topic))
+
+    def _science_facts_prompt(self, topic: str) -> str:
+        return f"""
         Create an original educational YouTube Shorts script about "{topic}" in English.
         
         Requirements:
@@ -92,11 +114,17 @@ class ScriptWriter:
         - RETURN ONLY THE ENGLISH SPEECH TEXT.
         - DO NOT include music cues or labels like [Narrator].
         """
-        script = self._call_with_retry(prompt)
+
+    async def expand_science_script(self, topic: str, short_script: str = "") -> str:
+        script = await self._call_with_retry(self._expand_science_prompt(topic, short_script), long_output=True)
         return self.clean_script(script)
 
-    def expand_science_script(self, topic: str, short_script: str = "") -> str:
-        prompt = f"""
+    def stream_expanded_science_script(self, topic: str, short_script: str = "") -> AsyncIterator[str]:
+        """expand_science_script as raw text chunks while the model writes it."""
+        return self.llm.stream(self._expand_science_prompt(topic, short_script), long_output=True)
+
+    def _expand_science_prompt(self, topic: str, short_script: str = "") -> str:
+        return f"""
         Expand the following topic/short script into a detailed, high-quality documentary-style script for a 3-4 minute YouTube video.
         
         Topic: {topic}
@@ -117,10 +145,8 @@ class ScriptWriter:
         - RETURN ONLY THE SPEECH TEXT. No cues or labels.
         - Aim for approximately 400-600 words.
         """
-        script = self._call_with_retry(prompt)
-        return self.clean_script(script)
 
-    def summarize_for_daily(self, news_items: List[Dict], channel_name: str = "Nepal Now") -> List[Dict]:
+    async def summarize_for_daily(self, news_items: List[Dict], channel_name: str = "Nepal Now") -> List[Dict]:
         news_text = "\n\n".join([f"Headline: {item['headline']}\nContent: {item['content']}" for item in news_items])
         prompt = f"""
         Summarize today's major news into a structured YouTube video script in Nepali for the channel "{channel_name}".
@@ -141,7 +167,7 @@ class ScriptWriter:
         - Professional reporting style.
         - RETURN ONLY THE JSON LIST.
         """
-        response = self._call_with_retry(prompt)
+        response = await self._call_with_retry(prompt, long_output=True)
         try:
             cleaned_json = self.clean_json_response(response)
             return json.loads(cleaned_json)
@@ -166,7 +192,7 @@ class ScriptWriter:
         if start != -1 and end != -1: return text[start:end+1].strip()
         return text.strip()
 
-    def generate_image_keywords(self, text: str, extra_context: str = "Science") -> List[str]:
+    async def generate_image_keywords(self, text: str, extra_context: str = "Science") -> List[str]:
         """
         Generates a list of specific visual search terms for the script.
         Uses the LLM to analyze the entire text and produce timed visual cues.
@@ -186,7 +212,7 @@ class ScriptWriter:
         """
         
         try:
-            response = self._call_with_retry(prompt)
+            response = await self._call_with_retry(prompt)
             keywords = [line.strip().replace('"', '').replace('- ', '') for line in response.split('\n') if line.strip() and not line.lower().startswith("here")]
             
             # Fallback if LLM fails
@@ -0,0 +1,57 @@
+import re
+from typing import List
+
+class SentenceSplitter:
+    """
+    Cuts streamed text into complete sentences as it arrives, so speech can be
+    synthesized before the whole script exists. A sentence ends at ।, ॥, !, ?
+    or . once the following character is whitespace, which leaves decimals
+    ("4.5") and the usual abbreviations ("डा.", "Dr.") alone. Sentences shorter
+    than min_chars are joined to the next one so TTS is not called per clause.
+    """
+    ABBREVIATIONS = {
+        "डा", "इ", "ई", "प्रा", "प", "वि.सं", "नं", "कि.मी", "मि",
+        "mr", "mrs", "ms", "dr", "prof", "st", "vs", "etc", "e.g", "i.e", "approx", "no",
+    }
+    _END = re.compile(r'[।॥!?.]["\'”’)]*(?=\s)')
+
+    def __init__(self, min_chars: int = 60):
+        self.min_chars = min_chars
+        self._buffer = ""
+        self._pending = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Adds streamed text; returns the sentences it completed."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in self._END.finditer(self._buffer):
+            end = match.end()
+            if self._buffer[match.start()] == "." and self._is_abbreviation(self._buffer[start:match.start()]):
+                continue
+            sentence = self._emit(self._buffer[start:end])
+            if sentence:
+                sentences.append(sentence)
+            start = end
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Whatever is left once the stream ends."""
+        rest = " ".join(part for part in (self._pending, self._buffer.strip()) if part)
+        self._buffer = self._pending = ""
+        return [rest] if rest else []
+
+    def _emit(self, sentence: str) -> str:
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            return ""
+        self._pending = f"{self._pending} {sentence}" if self._pending else sentence
+        if len(self._pending) < self.min_chars:
+            return ""
+        sentence, self._pending = self._pending, ""
+        return sentence
+
+    def _is_abbreviation(self, text: str) -> bool:
+        words = text.split()
+        return bool(words) and words[-1].lower() in self.ABBREVIATIONS
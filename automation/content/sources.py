@@ -0,0 +1,176 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from typing import List, Dict, AsyncIterator
+from .news_fetcher import RSSFetcher
+
+class NewsSource(ABC):
+    """
+    A producer of news items in the RSS item schema.
+    """
+    name = "source"
+
+    @abstractmethod
+    def stream(self) -> AsyncIterator[Dict]:
+        """Async generator yielding items as they are fetched."""
+        pass
+
+    def commit(self):
+        """Persists cursor state advanced by the last stream(); called after a successful run."""
+        pass
+
+    async def close(self):
+        pass
+
+
+class RSSSource(NewsSource):
+    name = "rss"
+
+    def __init__(self, fetcher: RSSFetcher):
+        self.fetcher = fetcher
+
+    async def stream(self) -> AsyncIterator[Dict]:
+        async for item in self.fetcher.fetch_iter_async():
+            yield item
+
+    def commit(self):
+        self.fetcher.commit_cursors()
+        # Poll times are saved with the cursors, so a test or failed run does not delay the next real poll
+        if self.fetcher.scheduler:
+            self.fetcher.scheduler.save()
+
+    async def close(self):
+        await self.fetcher.close()
+
+
+class TelegramSource(NewsSource):
+    name = "telegram"
+
+    def __init__(self, channels: List[str], limit: int = 10, state_file: str = None):
+        self.channels = channels
+        self.limit = limit
+        self.state_file = state_file
+        self.fetcher = None
+
+    async def stream(self) -> AsyncIterator[Dict]:
+        api_id, api_hash = os.getenv("TELEGRAM_API_ID"), os.getenv("TELEGRAM_API_HASH")
+        if not api_id or not api_hash:
+            print("Telegram source skipped: TELEGRAM_API_ID / TELEGRAM_API_HASH not set.")
+            return
+        try:
+            from fetchers.telegram_fetcher import TelegramFetcher
+        except ImportError as e:
+            print(f"Telegram source skipped: {e}")
+            return
+        # One long-lived session for all channels and, in watch mode, all polls
+        self.fetcher = self.fetcher or TelegramFetcher(api_id, api_hash, state_file=self.state_file)
+        for item in await self.fetcher.fetch_channels(self.channels, limit=self.limit):
+            yield RSSFetcher.complete_item(item)
+
+    def commit(self):
+        if self.fetcher:
+            self.fetcher.commit_min_ids()
+
+    async def close(self):
+        if self.fetcher:
+            await self.fetcher.disconnect()
+
+
+class DDGSource(NewsSource):
+    name = "ddg"
+
+    def __init__(self, queries: List[str], limit: int = 10):
+        self.queries = queries
+        self.limit = limit
+        self.fetcher = None
+
+    async def stream(self) -> AsyncIterator[Dict]:
+        try:
+            from fetchers.website_fetcher import DDGFetcher
+        except ImportError as e:
+            print(f"DuckDuckGo source skipped: {e}")
+            return
+        self.fetcher = self.fetcher or DDGFetcher()
+        for query in self.queries:
+            # duckduckgo_search is blocking, keep it off the event loop
+            items = await asyncio.to_thread(self.fetcher.fetch_latest_news, query, self.limit)
+            for item in items:
+                yield RSSFetcher.complete_item(item)
+
+
+class SourceMultiplexer:
+    """
+    Runs every configured source at once as async producers feeding one bounded
+    queue. Producers wait when the consumer falls behind, and items are
+    de-duplicated on headline_hash as they arrive.
+    """
+    SOURCE_TYPES = {
+        "rss": RSSSource,
+        "telegram": TelegramSource,
+        "ddg": DDGSource,
+    }
+
+    def __init__(self, sources: List[NewsSource], queue_size: int = 100):
+        self.sources = sources
+        self.queue_size = queue_size
+
+    @classmethod
+    def from_config(cls, config: Dict, rss_fetcher: RSSFetcher) -> "SourceMultiplexer":
+        """
+        Builds the registry from the channel YAML `sources` block. Without one,
+        only the RSS feeds are used, as before.
+        """
+        source_config = config.get('sources', {})
+        sources = []
+        if source_config.get('rss', True):
+            sources.append(cls.SOURCE_TYPES["rss"](rss_fetcher))
+        telegram = source_config.get('telegram') or {}
+        if telegram.get('channels'):
+            sources.append(cls.SOURCE_TYPES["telegram"](
+                telegram['channels'],
+                limit=telegram.get('limit', 10),
+                state_file=config.get('storage', {}).get('telegram_cursors')
+            ))
+        ddg = source_config.get('ddg') or {}
+        if ddg.get('queries'):
+            sources.append(cls.SOURCE_TYPES["ddg"](ddg['queries'], limit=ddg.get('limit', 10)))
+        return cls(sources, queue_size=source_config.get('queue_size', 100))
+
+    async def stream(self) -> AsyncIterator[Dict]:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        finished = object()
+
+        async def produce(source: NewsSource):
+            try:
+                async for item in source.stream():
+                    await queue.put(item)
+            except Exception as e:
+                print(f"Error in {source.name} source: {e}")
+            await queue.put(finished)
+
+        tasks = [asyncio.create_task(produce(source)) for source in self.sources]
+        seen_headlines = set()
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if item is finished:
+                    remaining -= 1
+                    continue
+                h_hash = item.get('headline_hash', item['hash'])
+                if h_hash in seen_headlines:
+                    continue
+                seen_headlines.add(h_hash)
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def commit(self):
+        for source in self.sources:
+            source.commit()
+
+    async def close(self):
+        for source in self.sources:
+            await source.close()
@@ -0,0 +1,129 @@
+import json
+import os
+import re
+import time
+import zlib
+from typing import Dict, List
+import numpy as np
+
+class StoryClusterIndex:
+    """
+    Groups items into event clusters that live across poll windows.
+    Each item becomes a hashed bag of character trigrams (headline weighted
+    double), and is assigned to the cluster whose centroid is most similar by
+    cosine, or starts a new one below `threshold`. Per cluster we keep when it
+    was first and last seen, which outlets ran it, its items and whether it was
+    posted, so a developing story is recognised instead of judged from scratch
+    every poll. Clusters idle for longer than max_age_hours are dropped.
+    """
+    DIM = 1024
+    NGRAM = 3
+    MAX_ITEMS = 50  # Item hashes kept per cluster
+
+    def __init__(self, path: str = None, threshold: float = 0.35, max_age_hours: float = 48):
+        self.path = path
+        self.threshold = threshold
+        self.max_age = max_age_hours * 3600
+        # Unnormalized vector sums; centroids are their normalized rows
+        self._sums = np.zeros((0, self.DIM), dtype=np.float32)
+        self._centroids = np.zeros((0, self.DIM), dtype=np.float32)
+        self.clusters: List[Dict] = []
+        self._next_id = 1
+        self._load()
+
+    def assign(self, item: Dict, now: float = None) -> Dict:
+        """Adds the item to its best-matching cluster (or a new one) and returns that cluster's state."""
+        now = int(now or time.time())
+        vector = self._vectorize(item)
+        index = -1
+        if len(self.clusters) and vector.any():
+            similarity = self._centroids @ vector
+            best = int(np.argmax(similarity))
+            if similarity[best] >= self.threshold:
+                index = best
+        if index < 0:
+            index = self._new_cluster(item, now)
+
+        cluster = self.clusters[index]
+        if item.get('hash') not in cluster["items"]:
+            self._sums[index] += vector
+            self._centroids[index] = self._normalize(self._sums[index])
+            cluster["items"] = (cluster["items"] + [item.get('hash')])[-self.MAX_ITEMS:]
+            cluster["size"] += 1
+        source = item.get('source', '')
+        if source and source not in cluster["outlets"]:
+            cluster["outlets"].append(source)
+        cluster["last_seen"] = now
+        return cluster
+
+    def mark_posted(self, cluster_id: int):
+        for cluster in self.clusters:
+            if cluster["id"] == cluster_id:
+                cluster["posted"] = True
+
+    def top_clusters(self, n: int, since: float = 0) -> List[Dict]:
+        """Clusters active since `since`, most widely reported first (for summaries)."""
+        active = [c for c in self.clusters if c["last_seen"] >= since]
+        return sorted(active, key=lambda c: (len(c["outlets"]), c["size"]), reverse=True)[:n]
+
+    def save(self):
+        """Drops idle clusters and persists the rest."""
+        if not self.path:
+            return
+        cutoff = time.time() - self.max_age
+        keep = [i for i, c in enumerate(self.clusters) if c["last_seen"] >= cutoff]
+        self.clusters = [self.clusters[i] for i in keep]
+        self._sums, self._centroids = self._sums[keep], self._centroids[keep]
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            meta = {"next_id": self._next_id, "clusters": self.clusters}
+            with open(self.path + ".tmp", 'wb') as f:
+                np.savez(f, sums=self._sums, meta=np.array(json.dumps(meta, ensure_ascii=False)))
+            os.replace(self.path + ".tmp", self.path)
+        except Exception as e:
+            print(f"Error saving story clusters {self.path}: {e}")
+
+    def _new_cluster(self, item: Dict, now: int) -> int:
+        self.clusters.append({
+            "id": self._next_id, "headline": item.get('headline', ''), "first_seen": now, "last_seen": now,
+            "outlets": [], "items": [], "size": 0, "posted": False
+        })
+        self._next_id += 1
+        self._sums = np.vstack([self._sums, np.zeros((1, self.DIM), dtype=np.float32)])
+        self._centroids = np.vstack([self._centroids, np.zeros((1, self.DIM), dtype=np.float32)])
+        return len(self.clusters) - 1
+
+    def _vectorize(self, item: Dict) -> np.ndarray:
+        vector = np.zeros(self.DIM, dtype=np.float32)
+        for text, weight in ((item.get('headline', ''), 2.0), (item.get('content', ''), 1.0)):
+            text = re.sub(r'<[^>]+>', ' ', text or '').lower()
+            text = " ".join(re.sub(r'[^\w\u0900-\u0963\u0966-\u097F]+', ' ', text).split())
+            grams = [text[i:i + self.NGRAM] for i in range(len(text) - self.NGRAM + 1)]
+            if grams:
+                buckets = np.fromiter((zlib.crc32(g.encode('utf-8')) % self.DIM for g in grams), dtype=np.int64, count=len(grams))
+                vector += weight * np.bincount(buckets, minlength=self.DIM).astype(np.float32)
+        return self._normalize(vector)
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                sums = data["sums"].astype(np.float32)
+                meta = json.loads(str(data["meta"]))
+        except Exception as e:
+            print(f"Ignoring unreadable story clusters {self.path}: {e}")
+            return
+        if sums.shape[1:] != (self.DIM,) or len(sums) != len(meta["clusters"]):
+            print(f"Story clusters {self.path} do not match this version; starting fresh")
+            return
+        self._sums = sums
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        self._centroids = np.divide(sums, norms, out=np.zeros_like(sums), where=norms > 0)
+        self.clusters = meta["clusters"]
+        self._next_id = meta["next_id"]
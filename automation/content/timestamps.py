@@ -0,0 +1,79 @@
+import calendar
+from datetime import datetime, timezone
+from email.utils import parsedate_tz, mktime_tz
+
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+
+# Epoch seconds at the start of each (year, month), filled on first use
+_MONTH_START = {}
+
+def parse_timestamp(value: str) -> int:
+    """
+    Parses a feed date to epoch seconds, 0 if unknown. RFC-822 dates
+    ("Mon, 06 Oct 2025 08:00:00 +0545"), which most feeds use, take a
+    split-based fast path; ISO-8601 goes straight to datetime.fromisoformat and
+    anything else to email.utils. Missing time zones are taken as UTC.
+    """
+    if not value:
+        return 0
+    if value[4:5] != "-":
+        try:
+            return _fast_rfc822(value.split())
+        except (ValueError, KeyError, IndexError):
+            pass
+    return _parse_slow(value)
+
+def _fast_rfc822(parts) -> int:
+    if not parts[0][:1].isdigit():
+        parts = parts[1:]  # Optional day name
+    day, month, year, clock = int(parts[0]), MONTHS[parts[1].lower()], int(parts[2]), parts[3]
+    if year < 100:
+        # Two-digit years, read the way email.utils does
+        year += 2000 if year < 50 else 1900
+    zone = parts[4] if len(parts) > 4 else ""
+    hms = clock.split(":")
+    ts = _epoch(year, month, day, int(hms[0]), int(hms[1]), int(hms[2]) if len(hms) > 2 else 0)
+    if zone[:1] in ("+", "-") and len(zone) == 5:
+        offset = int(zone[1:3]) * 3600 + int(zone[3:]) * 60
+        ts -= offset if zone[0] == "+" else -offset
+    elif zone not in ("", "GMT", "UTC", "UT", "Z"):
+        raise ValueError(zone)
+    return ts
+
+def _epoch(year: int, month: int, day: int, hour: int, minute: int, second: int) -> int:
+    if not (1 <= day <= 31 and hour < 24 and minute < 60 and second < 62):
+        raise ValueError("out of range")
+    start = _MONTH_START.get((year, month))
+    if start is None:
+        start = _MONTH_START[(year, month)] = calendar.timegm((year, month, 1, 0, 0, 0, 0, 0, 0))
+    return start + (day - 1) * 86400 + hour * 3600 + minute * 60 + second
+
+def _parse_slow(value: str) -> int:
+    value = value.strip()
+    if value[4:5] == "-":
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return int(dt.timestamp())
+        except ValueError:
+            pass
+    parsed = parsedate_tz(value)
+    return int(mktime_tz(parsed)) if parsed else 0
+
+
+if __name__ == "__main__":
+    # Self-check: the fast path must agree with email.utils
+    samples = [
+        "Mon, 06 Oct 2025 08:00:00 +0545",
+        "06 Oct 2025 08:00:00 GMT",
+        "Tue, 07 Oct 25 08:00:00 +0000",
+        "Fri, 01 Jan 99 23:59:59 -0500",
+        "Sat, 29 Feb 2020 12:30 +0100",
+    ]
+    for sample in samples:
+        expected = int(mktime_tz(parsedate_tz(sample)))
+        assert parse_timestamp(sample) == expected, (sample, parse_timestamp(sample), expected)
+    assert parse_timestamp("2025-10-06T08:00:00Z") == 1759737600
+    print(f"parse_timestamp agrees with email.utils on {len(samples)} RFC-822 samples")
@@ -1,18 +1,17 @@
+import asyncio
 import os
 import re
 from typing import List, Dict
-from google import genai
 from google.genai import types
-from groq import Groq
+from automation.content.llm_client import AsyncLLMClient
 
 class ScriptWriter:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, llm: AsyncLLMClient = None):
         self.api_key = api_key
-        self.client = genai.Client(api_key=api_key)
+        self.llm = llm or AsyncLLMClient.shared(api_key)
         self.model_id = "gemini-2.0-flash-exp"
-        self.groq_client = Groq(api_key=os.getenv("GROQ_API_KEY")) if os.getenv("GROQ_API_KEY") else None
 
-    def generate_story_script(self, topic_title: str) -> List[Dict]:
+    async def generate_story_script(self, topic_title: str) -> List[Dict]:
         """
         Generates a dialogue script between Baje and Arav.
         """
@@ -40,30 +39,17 @@ Example Format:
 
 Write the full script now.
 """
-        try:
-            response = self.client.models.generate_content(
-                model=self.model_id,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.7,
-                    top_p=0.9,
-                )
-            )
-            script_text = response.text
-        except Exception as e:
-            print(f"Gemini Error: {e}. Attempting Groq fallback...")
-            if self.groq_client:
-                try:
-                    chat_completion = self.groq_client.chat.completions.create(
-                        messages=[{"role": "user", "content": prompt}],
-                        model="llama-3.3-70b-versatile",
-                    )
-                    script_text = chat_completion.choices[0].message.content
-                except Exception as ge:
-                    print(f"Groq Error: {ge}")
-                    return []
-            else:
-                return []
+        script_text = await self.llm.generate(
+            prompt,
+            model_id=self.model_id,
+            config=types.GenerateContentConfig(
+                temperature=0.7,
+                top_p=0.9,
+            ),
+            long_output=True
+        )
+        if not script_text:
+            return []
         
         return self._parse_script(script_text)
 
@@ -89,6 +75,6 @@ Write the full script now.
 if __name__ == "__main__":
     # Test script writer
     writer = ScriptWriter(os.getenv("GEMINI_API_KEY"))
-    script = writer.generate_story_script("Mobile addiction and screen time")
+    script = asyncio.run(writer.generate_story_script("Mobile addiction and screen time"))
     for line in script[:5]:
         print(f"{line['speaker']} ({line['emotion']}): {line['text']}")
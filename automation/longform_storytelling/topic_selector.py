@@ -1,7 +1,6 @@
-import json
-import os
 import random
-from typing import List, Dict
+from typing import Dict
+from automation.state.history_log import HistoryLog
 
 class TopicSelector:
     TOPICS = [
@@ -17,33 +16,17 @@ class TopicSelector:
         {"id": "food_habits", "title": "Gundruk-Dhido vs Burger-Pizza", "weight": 1.2},
     ]
 
-    def __init__(self, history_file: str = "automation/storage/topic_history.json", cooldown: int = 5):
+    def __init__(self, history_file: str = "automation/storage/topic_history.log", cooldown: int = 5):
         self.history_file = history_file
         self.cooldown = cooldown
-        self._ensure_storage()
-
-    def _ensure_storage(self):
-        os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-        if not os.path.exists(self.history_file):
-            with open(self.history_file, 'w') as f:
-                json.dump([], f)
-
-    def _load_history(self) -> List[str]:
-        try:
-            with open(self.history_file, 'r') as f:
-                return json.load(f)
-        except:
-            return []
-
-    def _save_history(self, history: List[str]):
-        with open(self.history_file, 'w') as f:
-            json.dump(history[-20:], f)
+        # Imports the old topic_history.json on first use
+        self.history = HistoryLog(history_file, window=max(cooldown, 20))
 
     def select_topic(self) -> Dict:
-        history = self._load_history()
+        recent = self.history.last(self.cooldown)
         
         # Filter out topics in cooldown
-        available_topics = [t for t in self.TOPICS if t['id'] not in history[-self.cooldown:]]
+        available_topics = [t for t in self.TOPICS if t['id'] not in recent]
         
         if not available_topics:
             available_topics = self.TOPICS # Reset if all are in cooldown
@@ -53,8 +36,7 @@ class TopicSelector:
         selected = random.choices(available_topics, weights=weights, k=1)[0]
         
         # Update history
-        history.append(selected['id'])
-        self._save_history(history)
+        self.history.append(selected['id'])
         
         return selected
 
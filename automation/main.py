@@ -25,9 +25,10 @@ async def list_channels():
 async def main():
     parser = argparse.ArgumentParser(description="Multi-Channel Autonomous Media Platform")
     parser.add_argument("--config", help="Path to channel YAML config")
-    parser.add_argument("--mode", default="breaking", choices=["breaking", "daily", "shorts", "storytelling"], help="Execution mode")
+    parser.add_argument("--mode", default="breaking", choices=["breaking", "watch", "daily", "shorts", "storytelling"], help="Execution mode (watch: long-running breaking news poller)")
     parser.add_argument("--test", action="store_true", help="Run in test mode (skip upload)")
     parser.add_argument("--list", action="store_true", help="List available channels")
+    parser.add_argument("--reset-cursors", action="store_true", help="Forget per-feed cursors so every feed entry is replayed")
     
     args = parser.parse_args()
 
@@ -55,6 +56,13 @@ async def main():
         print(f"Error: Unknown channel type '{channel_type}'")
         sys.exit(1)
 
+    if args.mode == "watch" and channel_type != "news":
+        print("Error: watch mode is only supported for news channels")
+        sys.exit(1)
+
+    if args.reset_cursors and channel_type == "news":
+        pipeline.fetcher.reset_cursors()
+
     # Run Pipeline
     if pipeline:
         await pipeline.run(mode=args.mode, is_test=args.test)
@@ -3,10 +3,13 @@ import requests
 from duckduckgo_search import DDGS
 import random
 import time
+from .search_cache import SearchCache
 
 class ImageFetcher:
     def __init__(self, download_dir="automation/storage/temp_images"):
         self.download_dir = download_dir
+        self.search_cache = SearchCache.shared()
+        self.last_search_cached = False
         if not os.path.exists(download_dir):
             os.makedirs(download_dir)
 
@@ -39,7 +42,9 @@ class ImageFetcher:
             
             if len(paths) >= images_needed:
                 break
-            time.sleep(2)
+            # Cooldown only protects DDG's rate limit; cache hits made no request
+            if not self.last_search_cached:
+                time.sleep(2)
             
         return paths
 
@@ -54,27 +59,31 @@ class ImageFetcher:
         else:
             search_query = f"{query} {negative_filters}"
             
-        try:
+        def search():
             with DDGS() as ddgs:
-                results = ddgs.images(
+                return ddgs.images(
                     keywords=search_query,
                     region="wt-wt",
                     safesearch="on",
                     size="large",
                     type_image="photo"
                 )
-                if not results: return []
-                forbidden = ["diagram", "chart", "graph", "vector", "drawing", "illustration", "map", "infographic", "logo", "person", "face", "human", "man", "woman", "interview", "talking", "portrait"]
-                filtered = []
-                for r in results:
-                    url = r['image'].lower()
-                    title = r.get('title', '').lower()
-                    if any(f in url for f in forbidden) or any(f in title for f in forbidden):
-                        continue
-                    if url.split('.')[-1] in ['jpg', 'jpeg', 'png', 'webp']:
-                        filtered.append(r['image'])
-                random.shuffle(filtered)
-                return filtered[:max_results]
+
+        self.last_search_cached = False
+        try:
+            results, self.last_search_cached = self.search_cache.get_or_search("images", search_query, search)
+            if not results: return []
+            forbidden = ["diagram", "chart", "graph", "vector", "drawing", "illustration", "map", "infographic", "logo", "person", "face", "human", "man", "woman", "interview", "talking", "portrait"]
+            filtered = []
+            for r in results:
+                url = r['image'].lower()
+                title = r.get('title', '').lower()
+                if any(f in url for f in forbidden) or any(f in title for f in forbidden):
+                    continue
+                if url.split('.')[-1] in ['jpg', 'jpeg', 'png', 'webp']:
+                    filtered.append(r['image'])
+            random.shuffle(filtered)
+            return filtered[:max_results]
         except Exception as e:
             print(f"DDG Search error for '{query}': {e}")
             return []
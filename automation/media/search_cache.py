@@ -0,0 +1,86 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+class SearchCache:
+    """
+    On-disk cache of DuckDuckGo results keyed by search type + normalized query.
+    Entries expire after a per-type TTL and the least recently used ones are
+    evicted past max_entries. Use SearchCache.shared() so every fetcher in the
+    process reads and writes the same instance.
+    """
+    DEFAULT_PATH = "automation/storage/cache/ddg_search.json"
+    DEFAULT_TTLS = {
+        "news": 15 * 60,        # News goes stale quickly
+        "images": 7 * 86400,
+        "videos": 7 * 86400,
+    }
+    _instances = {}
+
+    def __init__(self, path: str = DEFAULT_PATH, ttls: Dict[str, int] = None, max_entries: int = 500):
+        self.path = path
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.entries = self._load()
+
+    @classmethod
+    def shared(cls, path: str = DEFAULT_PATH) -> "SearchCache":
+        if path not in cls._instances:
+            cls._instances[path] = cls(path)
+        return cls._instances[path]
+
+    def get(self, search_type: str, query: str, max_results: int = 0) -> Optional[List]:
+        key = self._key(search_type, query)
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        if time.time() - entry["ts"] > self.ttls.get(search_type, 86400) or entry["max_results"] < max_results:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry["results"]
+
+    def put(self, search_type: str, query: str, results: List, max_results: int = 0):
+        if not results:
+            # Empty results are usually a rate limit, not an answer worth keeping
+            return
+        key = self._key(search_type, query)
+        self.entries[key] = {"ts": time.time(), "max_results": max_results, "results": results}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self._save()
+
+    def get_or_search(self, search_type: str, query: str, search: Callable[[], List],
+                      max_results: int = 0) -> Tuple[List, bool]:
+        """Returns (results, cache_hit); search() is only called on a miss."""
+        cached = self.get(search_type, query, max_results)
+        if cached is not None:
+            return cached, True
+        results = list(search() or [])
+        self.put(search_type, query, results, max_results)
+        return results, False
+
+    @staticmethod
+    def _key(search_type: str, query: str) -> str:
+        return f"{search_type}:{' '.join(query.lower().split())}"
+
+    def _load(self) -> OrderedDict:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    # Stored oldest-first so the LRU order survives a reload
+                    return OrderedDict(json.load(f))
+            except Exception as e:
+                print(f"Ignoring unreadable search cache {self.path}: {e}")
+        return OrderedDict()
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(list(self.entries.items()), f, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving search cache {self.path}: {e}")
@@ -2,9 +2,14 @@ import asyncio
 import edge_tts
 import os
 import re
-from typing import List, Dict
+from typing import AsyncIterator, Callable, List, Dict
+from ..content.sentence_splitter import SentenceSplitter
 
 class TTSEngine:
+    # edge-tts speaks 24 kHz 48 kbit/s mono MP3: 6000 bytes per second of audio
+    MP3_BYTES_PER_SECOND = 6000
+    STREAM_CONCURRENCY = 3
+
     def __init__(self, voice_map=None, rate="+20%", pitch="+0Hz"):
         self.voice_map = voice_map or {
             "female": "ne-NP-HemkalaNeural",
@@ -57,6 +62,72 @@ class TTSEngine:
 
         return output_path, all_offsets, segment_durations
 
+    async def generate_audio_streamed(self, chunks: AsyncIterator[str], output_path: str, voice: str = None,
+                                      rate: str = None, pitch: str = None, clean: Callable[[str], str] = None):
+        """
+        Speaks text while it is still being written (e.g. ScriptWriter.stream_*):
+        every complete sentence is synthesized as soon as it arrives, up to
+        STREAM_CONCURRENCY at a time, and the parts are joined in order at the
+        end. MP3 frames concatenate as-is, and each part's word offsets are
+        shifted by the length of the parts before it. Raises if any part
+        failed, so the caller can fall back to speaking the full script.
+        Returns: (output_path, word_offsets, full_text)
+        """
+        splitter = SentenceSplitter()
+        semaphore = asyncio.Semaphore(self.STREAM_CONCURRENCY)
+        tasks = []
+        text_parts = []
+
+        async def speak(index: int, sentence: str):
+            part_path = f"{output_path}.part{index}.mp3"
+            async with semaphore:
+                _, offsets = await self.generate_audio(sentence, part_path, voice, rate=rate, pitch=pitch)
+            return part_path, offsets
+
+        def schedule(sentences: List[str]):
+            for sentence in sentences:
+                sentence = clean(sentence) if clean else sentence
+                if sentence.strip():
+                    tasks.append(asyncio.create_task(speak(len(tasks), sentence)))
+
+        try:
+            async for chunk in chunks:
+                text_parts.append(chunk)
+                schedule(splitter.feed(chunk))
+            schedule(splitter.flush())
+            parts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            self._remove_parts(output_path, len(tasks))
+            raise
+
+        missing = [path for path, _ in parts if not os.path.exists(path) or os.path.getsize(path) == 0]
+        if missing:
+            # Stitching around a gap would drop a sentence the captions still show
+            self._remove_parts(output_path, len(tasks))
+            raise RuntimeError(f"TTS failed for {len(missing)} of {len(parts)} streamed parts")
+
+        word_offsets = []
+        elapsed = 0.0
+        with open(output_path, "wb") as out:
+            for part_path, offsets in parts:
+                with open(part_path, "rb") as f:
+                    data = f.read()
+                out.write(data)
+                for off in offsets:
+                    word_offsets.append({**off, "start": off["start"] + elapsed})
+                elapsed += len(data) / self.MP3_BYTES_PER_SECOND
+        self._remove_parts(output_path, len(tasks))
+        print(f"Streamed TTS: {len(parts)} parts, ~{elapsed:.1f}s of audio")
+        return output_path, word_offsets, "".join(text_parts)
+
+    @staticmethod
+    def _remove_parts(output_path: str, count: int):
+        for i in range(count):
+            try: os.remove(f"{output_path}.part{i}.mp3")
+            except OSError: pass
+
     async def generate_audio(self, text: str, output_path: str, voice: str = None, rate: str = None, pitch: str = None):
         text = text.strip()
         
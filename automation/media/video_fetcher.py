@@ -2,10 +2,12 @@ import os
 import subprocess
 import time
 from duckduckgo_search import DDGS
+from .search_cache import SearchCache
 
 class VideoFetcher:
     def __init__(self, download_dir="automation/storage/temp_videos"):
         self.download_dir = download_dir
+        self.search_cache = SearchCache.shared()
         if not os.path.exists(download_dir):
             os.makedirs(download_dir)
 
@@ -38,14 +40,13 @@ class VideoFetcher:
         paths = []
 
         try:
-            with DDGS() as ddgs:
-                search_results = ddgs.text(search_query, max_results=20)
-                for r in search_results:
-                    url = r['href']
-                    # Broaden the list of supported sites
-                    if any(x in url for x in ['pexels.com', 'pixabay.com', 'mixkit.co', 'coverr.co', 'videezy.com', 'videvo.net']):
-                        results.append(url)
-                    if len(results) >= count * 3: break
+            search_results = self._search_text(search_query, max_results=20)
+            for r in search_results:
+                url = r['href']
+                # Broaden the list of supported sites
+                if any(x in url for x in ['pexels.com', 'pixabay.com', 'mixkit.co', 'coverr.co', 'videezy.com', 'videvo.net']):
+                    results.append(url)
+                if len(results) >= count * 3: break
         except Exception as e:
             print(f"DDG Search error for videos: {e}")
 
@@ -60,12 +61,11 @@ class VideoFetcher:
             for f_query in fallbacks:
                 print(f"No results for '{query}'. Trying fallback: {f_query}")
                 try:
-                    with DDGS() as ddgs:
-                        search_results = ddgs.text(f_query + " stock video -person", max_results=10)
-                        for r in search_results:
-                            if any(x in r['href'] for x in ['pexels', 'pixabay', 'mixkit']):
-                                results.append(r['href'])
-                        if results: break
+                    search_results = self._search_text(f_query + " stock video -person", max_results=10)
+                    for r in search_results:
+                        if any(x in r['href'] for x in ['pexels', 'pixabay', 'mixkit']):
+                            results.append(r['href'])
+                    if results: break
                 except: continue
 
         for i, url in enumerate(results):
@@ -78,6 +78,13 @@ class VideoFetcher:
         
         return paths
 
+    def _search_text(self, query: str, max_results: int) -> list:
+        def search():
+            with DDGS() as ddgs:
+                return ddgs.text(query, max_results=max_results)
+        results, _ = self.search_cache.get_or_search("videos", query, search, max_results=max_results)
+        return results
+
     def _download_with_ytdlp(self, url: str, filename: str) -> str:
         save_path = os.path.join(self.download_dir, filename)
         try:
@@ -1,11 +1,19 @@
 import os
-import json
 import asyncio
-from typing import List, Dict
+from contextlib import aclosing
+from typing import List, Dict, AsyncIterator
 from .base_pipeline import BasePipeline
 from ..content.news_fetcher import RSSFetcher
+from ..content.sources import SourceMultiplexer
+from ..content.feed_scheduler import FeedScheduler
+from ..content.websub import WebSubReceiver, WebSubSubscriber
 from ..content.classifier import NewsClassifier
+from ..content.near_duplicates import NearDuplicateIndex
+from ..content.ranking import BreakingScorer
+from ..content.story_clusters import StoryClusterIndex
+from ..content.breaking_backlog import BreakingBacklog
 from ..content.script_writer import ScriptWriter
+from ..state.fingerprint_store import FingerprintStore
 from ..media.image_fetcher import ImageFetcher
 from ..media.tts import TTSEngine
 from ..media.video_shorts import VideoShortsGenerator
@@ -23,31 +31,88 @@ from ..longform_storytelling.video_generator import StoryVideoGenerator
 class NepaliNewsPipeline(BasePipeline):
     def __init__(self, config):
         super().__init__(config)
-        self.fetcher = RSSFetcher(config['feeds'])
-        self.classifier = NewsClassifier()
+        ingest = config.get('ingest', {})
+        schedule = config.get('schedule', {})
+        self.scheduler = FeedScheduler(
+            config['feeds'],
+            state_file=config['storage'].get('feed_schedule'),
+            min_interval_minutes=schedule.get('feed_poll_min_minutes', 5),
+            max_interval_minutes=schedule.get('feed_poll_max_minutes', 180),
+            default_interval_minutes=schedule.get('breaking_interval_minutes', 30)
+        )
+        self.fetcher = RSSFetcher(
+            config['feeds'],
+            timeout=ingest.get('timeout_seconds', 15),
+            host_timeouts=ingest.get('host_timeouts'),
+            cache_file=config['storage'].get('feed_cache'),
+            cursor_file=config['storage'].get('feed_cursors'),
+            scheduler=self.scheduler
+        )
+        self.sources = SourceMultiplexer.from_config(config, rss_fetcher=self.fetcher)
+        classifier = config.get('classifier', {})
+        self.classifier = NewsClassifier(
+            breaking_window_hours=classifier.get('breaking_window_hours', 2),
+            keywords=classifier.get('keywords'),
+            match_content=classifier.get('match_content', False)
+        )
         self.script_writer = ScriptWriter(os.getenv("GEMINI_API_KEY"))
         self.image_fetcher = ImageFetcher()
         self.tts = TTSEngine(voice_map=config['tts_voice'], rate="+15%")
         self.vgen_shorts = VideoShortsGenerator()
         self.vgen_long = VideoLongGenerator() # Keep for other uses if needed
         self.lip_sync = LipSyncEngine()
-        self.posted_file = config['storage']['posted_news']
+        # Fingerprints of everything posted, shared with the other channels
+        ranking = config.get('ranking', {})
+        self.scorer = BreakingScorer(
+            self.classifier,
+            keyword_weights=ranking.get('keyword_weights'),
+            source_priority=ranking.get('source_priority'),
+            half_life_hours=ranking.get('half_life_hours', 2),
+            posted_cluster_penalty=ranking.get('posted_cluster_penalty', 0.25)
+        )
+        self.max_breaking = ranking.get('max_videos', 2)
+        clustering = config.get('clusters', {})
+        self.clusters = StoryClusterIndex(
+            config['storage'].get('story_clusters'),
+            threshold=clustering.get('threshold', 0.35),
+            max_age_hours=clustering.get('max_age_hours', 48)
+        )
+        # Candidates left over by earlier runs, fed back into the next poll
+        self.backlog = BreakingBacklog(
+            config['storage'].get('breaking_backlog'),
+            max_age_hours=classifier.get('breaking_window_hours', 2)
+        )
+        # Posted items of every channel; expire by age so old stories cannot come back while still in feeds
+        self.posted = FingerprintStore.shared(
+            config['storage'].get('fingerprints', FingerprintStore.DEFAULT_PATH),
+            max_age_days=config['storage'].get('fingerprint_max_age_days', FingerprintStore.DEFAULT_MAX_AGE_DAYS)
+        )
+        near = config.get('near_duplicates', {})
+        self.near_duplicates = NearDuplicateIndex(
+            config['storage'].get('near_duplicates'),
+            threshold=near.get('threshold', 0.4),
+            max_age_days=near.get('max_age_days', 3)
+        )
         
         # Storytelling Components
         self.topic_selector = TopicSelector()
-        self.story_writer = StoryScriptWriter(os.getenv("GEMINI_API_KEY"))
+        self.story_writer = StoryScriptWriter(os.getenv("GEMINI_API_KEY"), llm=self.script_writer.llm)
         self.story_tts = StoryTTSEngine()
         self.story_vgen = StoryVideoGenerator()
 
     async def run(self, mode="breaking", is_test=False):
         """
         Runs the news pipeline.
-        mode: "breaking" (Shorts) or "daily" (Long/Summary)
+        mode: "breaking" (Shorts), "watch" (long-running breaking) or "daily" (Long/Summary)
         """
         print(f"--- Starting News Pipeline [{mode}] ---")
         if mode == "breaking":
-            news_items = self.fetcher.fetch_all()
-            await self._run_breaking(news_items, is_test)
+            try:
+                await self._poll_breaking(is_test)
+            finally:
+                await self.sources.close()
+        elif mode == "watch":
+            await self._run_watch(is_test)
         elif mode == "daily" or mode == "storytelling":
             await self._run_storytelling(is_test)
         
@@ -55,31 +120,145 @@ class NepaliNewsPipeline(BasePipeline):
         self.cleanup_storage()
         print(f"--- News Pipeline [{mode}] Completed ---")
 
-    async def _run_breaking(self, news_items: List[Dict], is_test: bool):
-        posted_hashes = self._load_posted_hashes()
-        breaking_news = self.classifier.filter_breaking(news_items)
-        
-        # De-duplicate within this run using headline_hash
-        unique_breaking = []
-        seen_headlines_this_run = set()
-        for item in breaking_news:
-            h_hash = item.get('headline_hash', item['hash'])
-            if h_hash not in seen_headlines_this_run:
-                unique_breaking.append(item)
-                seen_headlines_this_run.add(h_hash)
+    async def _poll_breaking(self, is_test: bool):
+        # Items are streamed so the first breaking story is processed while other sources download
+        async with aclosing(self._with_backlog(self.sources.stream())) as news_items:
+            await self._run_breaking(news_items, is_test)
+        if not is_test:
+            self._commit()
+
+    async def _with_backlog(self, news_items: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+        for item in self.backlog.items():
+            yield item
+        async for item in news_items:
+            yield item
+
+    def _commit(self):
+        """Persists what a successful, non-test run consumed: source cursors and the leftover candidates."""
+        self.sources.commit()
+        self.backlog.save()
+
+    async def _run_watch(self, is_test: bool):
+        """
+        Daemon mode: keeps sources, HTTP/Telegram sessions and caches warm and
+        polls again as soon as the scheduler says a feed is due, handing new
+        breaking items to _run_breaking. Runs until interrupted.
+        """
+        min_wait = self.config.get('schedule', {}).get('watch_min_wait_seconds', 60)
+        print("Watching sources for breaking news (Ctrl+C to stop)...")
+        pushed, receiver, subscriber = await self._start_websub()
+        try:
+            while True:
+                try:
+                    await self._poll_breaking(is_test)
+                    if subscriber:
+                        await subscriber.renew_due()
+                except Exception as e:
+                    # A bad poll must not kill the watcher; the next one retries
+                    print(f"Watch poll failed: {e}")
+                self.cleanup_storage()
+                wait = max(self.scheduler.seconds_until_due(), min_wait)
+                print(f"Next poll in {wait:.0f}s")
+                await self._wait_for_poll(wait, pushed, is_test)
+        finally:
+            if subscriber:
+                await subscriber.close()
+                await receiver.stop()
+            await self.sources.close()
+
+    async def _start_websub(self):
+        """
+        Subscribes feeds that advertise a WebSub hub when `websub.enabled` is set.
+        Returns (queue of pushed item lists, receiver, subscriber), all None when disabled.
+        """
+        websub = self.config.get('websub', {})
+        if not websub.get('enabled'):
+            return None, None, None
+        pushed = asyncio.Queue()
+        receiver = WebSubReceiver(
+            lambda url, body: pushed.put_nowait(self.fetcher.parse_pushed(url, body)),
+            host=websub.get('host', '0.0.0.0'),
+            port=websub.get('port', 8900)
+        )
+        await receiver.start()
+        subscriber = WebSubSubscriber(receiver, websub['callback_base'], lease_seconds=websub.get('lease_seconds', 86400))
+        pushed_feeds = await subscriber.subscribe_all(self.config['feeds'])
+        print(f"WebSub push active for {len(pushed_feeds)}/{len(self.config['feeds'])} feeds; the rest are polled.")
+        return pushed, receiver, subscriber
+
+    async def _wait_for_poll(self, wait: float, pushed, is_test: bool):
+        # Sleep until the next poll, processing pushed items as they arrive
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        if pushed is None:
+            await asyncio.sleep(wait)
+            return
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                items = await asyncio.wait_for(pushed.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+            if not items:
+                continue
+            try:
+                await self._run_breaking(items, is_test)
+                if not is_test:
+                    self._commit()
+            except Exception as e:
+                print(f"Processing pushed items failed: {e}")
 
+    async def _run_breaking(self, news_items, is_test: bool):
+        """
+        news_items may be a list or an async iterable (RSSFetcher.fetch_iter_async);
+        either way items are classified and de-duplicated as they arrive, then the
+        whole batch is scored and the best stories are rendered first.
+        """
+        try:
+            await self._process_breaking(news_items, is_test)
+        finally:
+            # Stories queued but not posted (failed or over the limit) come back next poll
+            # through the backlog, so their near-duplicate entries must not block them
+            self.near_duplicates.clear_queued()
+            if not is_test:
+                self.clusters.save()
+
+    async def _process_breaking(self, news_items, is_test: bool):
+        candidates = [item async for item in self._unique_breaking(news_items, is_test)]
+        # A few spares behind the budget in case a render fails or an item was already posted
+        ranked = self.scorer.top_k(candidates, self.max_breaking * 3)
+        if ranked:
+            print(f"Ranked {len(candidates)} breaking items; top score {ranked[0]['score']:.2f}: {ranked[0]['headline']}")
+
+        scripts = await self._rewrite_ahead(ranked, is_test)
+
+        # Hashes of candidates this run dealt with; the rest go to the backlog
+        handled = set()
+        try:
+            await self._render_breaking(ranked, scripts, is_test, handled)
+        finally:
+            if not is_test:
+                self.backlog.update(candidates, handled)
+
+    async def _render_breaking(self, ranked: List[Dict], scripts: Dict[str, str], is_test: bool, handled: set):
         count = 0
-        for i, item in enumerate(unique_breaking):
+        seen_count = 0
+        rendered_clusters = set()
+        for item in ranked:
+            # One video per developing story per run
+            if item.get('cluster_id') in rendered_clusters:
+                handled.add(item['hash'])
+                continue
             # In test mode, we allow processing already posted news to verify the pipeline
             # We limit to 1 item in test mode to save time/resources
-            if is_test and i >= 1: break
-            
-            h_hash = item.get('headline_hash', item['hash'])
-            is_new = item['hash'] not in posted_hashes and h_hash not in posted_hashes
+            if is_test and seen_count >= 1: break
+            seen_count += 1
             
-            if is_test or is_new:
+            if is_test or not self.posted.is_posted(item):
                 print(f"{'[TEST] ' if is_test else ''}Processing Breaking: {item['headline']}")
-                script = self.script_writer.rewrite_for_shorts(item['headline'], item['content'])
+                script = scripts.get(item['hash'])
+                if script is None:
+                    # A spare, reached because an earlier render failed
+                    script = await self.script_writer.rewrite_for_shorts(item['headline'], item['content'])
                 
                 audio_path = f"automation/storage/news_breaking_{item['hash'][:8]}.mp3"
                 _, word_offsets = await self.tts.generate_audio(script, audio_path)
@@ -117,14 +296,64 @@ class NepaliNewsPipeline(BasePipeline):
                     title = f"BREAKING: {item['headline'][:70]}"
                     uploader.upload_video(video_path, title, f"{script}\n#News #Nepal", ["News", "Nepal"])
                 
-                # Save both hashes to prevent future duplicates
-                posted_hashes.append(item['hash'])
-                if 'headline_hash' in item:
-                    posted_hashes.append(item['headline_hash'])
-                
-                self._save_posted_hashes(posted_hashes)
+                if not is_test:
+                    # A test render must not make production treat the story as already covered
+                    # Save both hashes to prevent future duplicates
+                    self.posted.add_many([item['hash'], item.get('headline_hash', item['hash'])])
+                    self.near_duplicates.mark_posted(item['hash'])
+                    self.near_duplicates.save()
+                    self.clusters.mark_posted(item['cluster_id'])
+                rendered_clusters.add(item['cluster_id'])
+                handled.add(item['hash'])
                 count += 1
-                if count >= 2: break
+                if count >= self.max_breaking: break
+            else:
+                # Posted by an earlier run or another channel
+                handled.add(item['hash'])
+
+    async def _rewrite_ahead(self, ranked: List[Dict], is_test: bool) -> Dict[str, str]:
+        """
+        Scripts for the items the render loop will most likely take (one per
+        cluster, not yet posted, up to the budget), written in one batched
+        round trip instead of one request per item. Keyed by item hash.
+        """
+        budget = 1 if is_test else self.max_breaking
+        picked, clusters = [], set()
+        for item in ranked:
+            if len(picked) >= budget:
+                break
+            if item.get('cluster_id') in clusters or (not is_test and self.posted.is_posted(item)):
+                continue
+            clusters.add(item.get('cluster_id'))
+            picked.append(item)
+        if not picked:
+            return {}
+        scripts = await self.script_writer.rewrite_batch(picked)
+        return {item['hash']: script for item, script in zip(picked, scripts)}
+
+    async def _unique_breaking(self, news_items, is_test: bool = False) -> AsyncIterator[Dict]:
+        # Every item joins its event cluster first, so outlets are credited even for the duplicates dropped below
+        seen_headlines_this_run = set()
+        async for item in self.classifier.aiter_breaking(news_items):
+            cluster = self.clusters.assign(item)
+            item['cluster_id'] = cluster['id']
+            item['outlets'] = cluster['outlets']
+            item['cluster_posted'] = cluster['posted']
+
+            # De-duplicate within this run using headline_hash, as items arrive
+            h_hash = item.get('headline_hash', item['hash'])
+            if h_hash in seen_headlines_this_run:
+                continue
+            seen_headlines_this_run.add(h_hash)
+            # Same story from another outlet, reworded: drop it before any LLM/TTS work.
+            # Test runs may reprocess posted stories, so only this run's queue counts there.
+            signature = self.near_duplicates.signature(item)
+            similar = self.near_duplicates.find(signature, include_posted=not is_test)
+            if similar:
+                print(f"Skipping near-duplicate: {item['headline']}")
+                continue
+            self.near_duplicates.add(item['hash'], signature)
+            yield item
         
     async def _run_storytelling(self, is_test: bool):
         print("Running Storytelling Program: Baje & Arav")
@@ -134,7 +363,7 @@ class NepaliNewsPipeline(BasePipeline):
         print(f"Current Topic ID: {topic['id']}")
         
         # 2. Generate Script
-        script = self.story_writer.generate_story_script(topic['title'])
+        script = await self.story_writer.generate_story_script(topic['title'])
         if not script:
             print("Failed to generate story script.")
             return
@@ -154,15 +383,3 @@ class NepaliNewsPipeline(BasePipeline):
             title = f"बाजे र Gen-Z: {topic['title']}"
             description = f"हल्का गफ, गहिरो कुरा। \n\nआजको विषय: {topic['title']}\n#Nepal #GenZ #Baje #Storytelling"
             uploader.upload_video(video_path, title, description, ["Nepal", "GenZ", "Stories", "Baje"])
-
-    def _load_posted_hashes(self):
-        if os.path.exists(self.posted_file):
-            try:
-                with open(self.posted_file, 'r') as f: return json.load(f)
-            except: return []
-        return []
-
-    def _save_posted_hashes(self, hashes):
-        os.makedirs(os.path.dirname(self.posted_file), exist_ok=True)
-        with open(self.posted_file, 'w') as f:
-            json.dump(hashes[-500:], f)
@@ -3,6 +3,7 @@ import asyncio
 import random
 from .base_pipeline import BasePipeline
 from ..content.science_topic_generator import ScienceTopicGenerator
+from ..state.fingerprint_store import FingerprintStore
 from ..content.script_writer import ScriptWriter
 from ..media.image_fetcher import ImageFetcher
 from ..media.video_fetcher import VideoFetcher
@@ -18,7 +19,11 @@ class SciencePipeline(BasePipeline):
         self.script_writer = ScriptWriter(os.getenv("GEMINI_API_KEY"))
         self.topic_gen = ScienceTopicGenerator(
             config['storage']['posted_science'],
-            config['topics']
+            config['topics'],
+            seen=FingerprintStore.shared(
+                config['storage'].get('fingerprints', FingerprintStore.DEFAULT_PATH),
+                max_age_days=config['storage'].get('fingerprint_max_age_days', FingerprintStore.DEFAULT_MAX_AGE_DAYS)
+            )
         )
         self.image_fetcher = ImageFetcher()
         self.video_fetcher = VideoFetcher()
@@ -38,7 +43,7 @@ class SciencePipeline(BasePipeline):
         print(f"--- Starting Science Pipeline [{mode}] for {self.config.get('channel_id')} ---")
         
         # 1. Generate Topic
-        topic = self.topic_gen.get_next_topic(self.script_writer)
+        topic = await self.topic_gen.get_next_topic(self.script_writer)
         print(f"Topic: {topic}")
         
         if mode == "shorts":
@@ -51,19 +56,20 @@ class SciencePipeline(BasePipeline):
         print(f"--- Science Pipeline [{mode}] Completed ---")
 
     async def _run_shorts(self, topic: str, is_test: bool):
-        # 2. Generate Script
-        script = self.script_writer.generate_science_facts(topic)
+        # 2. Generate Script and Audio (sentences are spoken while the script is still being written)
+        male_voice = self.config.get('tts_voice', {}).get('male', "en-US-GuyNeural")
+        audio_path = "automation/storage/science_shorts_temp.mp3"
+        script, word_offsets = await self._script_with_audio(
+            self.script_writer.stream_science_facts(topic),
+            lambda: self.script_writer.generate_science_facts(topic),
+            audio_path, male_voice
+        )
         print(f"Short Script generated.")
         
         # 3. Fetch Media
         media_paths = await self._fetch_media(topic, script)
-            
-        # 4. Generate Audio
-        male_voice = self.config.get('tts_voice', {}).get('male', "en-US-GuyNeural")
-        audio_path = "automation/storage/science_shorts_temp.mp3"
-        _, word_offsets = await self.tts.generate_audio(script, audio_path, voice=male_voice)
         
-        # 5. Create Video
+        # 4. Create Video
         video_path = "automation/storage/science_shorts_final.mp4"
         self.vgen.create_shorts(
             script, 
@@ -74,24 +80,25 @@ class SciencePipeline(BasePipeline):
             branding=self.config.get('branding')
         )
         
-        # 6. Upload
+        # 5. Upload
         if True: # Always call _upload, it handles is_test internally
             await self._upload(video_path, f"{topic} #Shorts", script, topic, is_test=is_test)
 
     async def _run_daily(self, topic: str, is_test: bool):
-        # 2. Generate Expanded Script
-        script = self.script_writer.expand_science_script(topic)
+        # 2. Generate Expanded Script and Audio together
+        male_voice = self.config.get('tts_voice', {}).get('male', "en-US-GuyNeural")
+        audio_path = "automation/storage/science_long_temp.mp3"
+        script, word_offsets = await self._script_with_audio(
+            self.script_writer.stream_expanded_science_script(topic),
+            lambda: self.script_writer.expand_science_script(topic),
+            audio_path, male_voice
+        )
         print(f"Expanded Script generated (~{len(script.split())} words).")
         
         # 3. Fetch Media (More for long form)
         media_paths = await self._fetch_media(topic, script, count_per_kw=3)
-            
-        # 4. Generate Audio
-        male_voice = self.config.get('tts_voice', {}).get('male', "en-US-GuyNeural")
-        audio_path = "automation/storage/science_long_temp.mp3"
-        _, word_offsets = await self.tts.generate_audio(script, audio_path, voice=male_voice)
         
-        # 5. Create Long Video (Detailed)
+        # 4. Create Long Video (Detailed)
         # For now we use VideoLongGenerator but with segments for the same topic
         segments = [{"type": "science", "text": script, "topic": topic}]
         video_path = "automation/storage/science_long_final.mp4"
@@ -102,13 +109,37 @@ class SciencePipeline(BasePipeline):
         # Pass lower music volume 0.04
         vgen_long.create_daily_summary(segments, audio_path, video_path, word_offsets, media_paths=media_paths)
         
-        # 6. Upload
+        # 5. Upload
         if True: # Always call _upload, it handles is_test internally
             await self._upload(video_path, f"The Science of {topic}: Detailed Explanation", script, topic, is_test=is_test, is_shorts=False)
 
+    async def _script_with_audio(self, stream, generate, audio_path: str, voice: str):
+        """
+        Narrates the streamed script sentence by sentence as the model writes it,
+        so the wait is about the longer of the two rather than their sum. If the
+        stream breaks midway, the script is generated again in full and spoken afterwards.
+        """
+        try:
+            _, word_offsets, text = await self.tts.generate_audio_streamed(
+                stream, audio_path, voice=voice, clean=self.script_writer.clean_script
+            )
+            script = self.script_writer.clean_script(text)
+            if script and word_offsets:
+                return script, word_offsets
+            print("Streamed script produced no audio; generating it in full.")
+        except Exception as e:
+            print(f"Streaming script to TTS failed: {e}. Generating it in full.")
+        script = await generate()
+        _, word_offsets = await self.tts.generate_audio(script, audio_path, voice=voice)
+        return script, word_offsets
+
     async def _fetch_media(self, topic, script, count_per_kw=1):
         print("Fetching multi-segment media...")
-        keywords_list = self.script_writer.generate_image_keywords(script, extra_context=topic)
+        # Both keyword prompts go out together; the image one is only needed after the clips
+        image_keywords = asyncio.create_task(
+            self.script_writer.generate_image_keywords(script, extra_context=f"{topic} cinematic space universe nature")
+        )
+        keywords_list = await self.script_writer.generate_image_keywords(script, extra_context=topic)
         media_paths = []
         
         for i, kw in enumerate(keywords_list):
@@ -124,7 +155,7 @@ class SciencePipeline(BasePipeline):
         
         # User requested: "It is better to use images than to use videos that has people in it."
         # So we augment with more images.
-        img_kw = self.script_writer.generate_image_keywords(script, extra_context=f"{topic} cinematic space universe nature")
+        img_kw = await image_keywords
         img_paths = self.image_fetcher.fetch_multi_images(img_kw, "science_temp", topic_context=topic)
         media_paths.extend(img_paths)
         
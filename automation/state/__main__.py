@@ -0,0 +1,50 @@
+"""
+State maintenance commands.
+
+    # Git merge driver (see .gitattributes and the workflow):
+    python -m automation.state merge %O %A %B %P
+
+    # Rewrite a seen/history log with one line per key, optionally expiring old keys
+    python -m automation.state compact automation/storage/posted_science.log [--max-age-days 30]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from automation.state.merge import merge_state, compact_log
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m automation.state", description="Merge and compact automation state files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    merge = commands.add_parser("merge", help="Three-way merge driver: merges THEIRS into OURS in place")
+    merge.add_argument("base", help="Common ancestor (%%O); unused, state only grows")
+    merge.add_argument("ours", help="Our version (%%A); receives the result")
+    merge.add_argument("theirs", help="Their version (%%B)")
+    merge.add_argument("path", nargs="?", help="Path in the repo (%%P); picks the format. Defaults to OURS")
+
+    compact = commands.add_parser("compact", help="Compact a seen/history log in place")
+    compact.add_argument("log")
+    compact.add_argument("--max-age-days", type=float, help="Drop keys last seen longer ago than this")
+
+    args = parser.parse_args()
+    if args.command == "compact":
+        compact_log(args.log, args.max_age_days)
+        return 0
+
+    path = args.path or args.ours
+    try:
+        if not merge_state(args.ours, args.theirs, path):
+            print(f"No merge strategy for {path}")
+            return 1
+    except Exception as e:
+        # A non-zero exit leaves the conflict for git to report instead of committing a bad file
+        print(f"Merging {path} failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
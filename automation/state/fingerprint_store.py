@@ -0,0 +1,294 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterable, List, Set
+import numpy as np
+
+class FingerprintStore:
+    """
+    Cross-channel record of everything already posted, kept as 8-byte records
+    in a sorted binary file: the key's fingerprint (the first 48 bits of its
+    SHA-256) above the 16-bit day it was posted. A memory-mapped Bloom filter
+    sits in front of it, so a key that was never seen is usually rejected
+    without touching the index; the rest are a binary search over the
+    memory-mapped file.
+
+    New keys are appended to a journal next to the file and indexed in memory,
+    so posting costs one small write. The journal is folded into the sorted
+    file once it reaches JOURNAL_LIMIT records or holds expired ones, and that
+    compaction also drops keys posted more than max_age_days ago.
+
+    The Bloom filter lives in the rebuildable cache and is regenerated from the
+    fingerprint file whenever it is missing, stale or too small. The first time
+    the fingerprint file is created it is seeded from the per-channel files that
+    came before it.
+    """
+    DEFAULT_PATH = "automation/storage/fingerprints.bin"
+    DEFAULT_BLOOM_PATH = "automation/storage/cache/fingerprints.bloom"
+    DEFAULT_MAX_AGE_DAYS = 30
+    LEGACY_FILES = [
+        "automation/storage/posted_news.log",
+        "automation/storage/posted_news.json",
+        "automation/storage/posted_science.log",
+        "automation/storage/posted_science.json",
+        "storage/posted_breaking.json",
+        "storage/posted_breaking_nepali.json",
+    ]
+    BITS_PER_KEY = 10    # ~1% false positives with 7 hashes
+    HASHES = 7
+    MIN_CAPACITY = 1 << 16
+    DAY_BITS = 16        # Days since the epoch, good until 2149
+    JOURNAL_LIMIT = 4096
+    _HEADER = struct.Struct(">4sIQQQ")  # magic, hashes, bits, fingerprint count, xor of fingerprints
+    _MAGIC = b"BLM1"
+    _instances = {}
+
+    def __init__(self, path: str = DEFAULT_PATH, bloom_path: str = DEFAULT_BLOOM_PATH, legacy_files: List[str] = None,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        self.path = path
+        self.bloom_path = bloom_path
+        self.journal_path = os.path.splitext(path)[0] + ".journal.bin"
+        self.max_age = max_age_days * 86400
+        if not os.path.exists(path) and not os.path.exists(self.journal_path):
+            self._seed_from_legacy(self.LEGACY_FILES if legacy_files is None else legacy_files)
+        self._records = self._load_records()
+        self._journal = self._read_journal()
+        self._journal_fingerprints: Set[int] = set((self._journal >> np.uint64(self.DAY_BITS)).tolist())
+        self._bloom = None
+        self._bloom_bits = 0
+        if len(self._journal) >= self.JOURNAL_LIMIT or self._has_expired():
+            self.compact()
+        else:
+            self._open_bloom()
+            self._set_bits(self._journal >> np.uint64(self.DAY_BITS))
+
+    @classmethod
+    def shared(cls, path: str = DEFAULT_PATH, max_age_days: float = DEFAULT_MAX_AGE_DAYS) -> "FingerprintStore":
+        """One instance per file, so every pipeline in the process sees the same state."""
+        if path not in cls._instances:
+            cls._instances[path] = cls(path, max_age_days=max_age_days)
+        return cls._instances[path]
+
+    @staticmethod
+    def fingerprint(key: str) -> int:
+        key = str(key)
+        if len(key) == 64:
+            try:
+                # Already a hex SHA-256 (item hashes): its first 12 digits are the fingerprint
+                return int(key[:12], 16)
+            except ValueError:
+                pass
+        return int.from_bytes(hashlib.sha256(key.encode('utf-8')).digest()[:6], "big")
+
+    def __contains__(self, key: str) -> bool:
+        fp = self.fingerprint(key)
+        if not self._bloom_may_contain(fp):
+            return False
+        if fp in self._journal_fingerprints:
+            return True
+        # The day sits below the fingerprint, so a key's records start at fp << DAY_BITS
+        i = int(np.searchsorted(self._records, np.uint64(fp << self.DAY_BITS)))
+        return i < len(self._records) and int(self._records[i]) >> self.DAY_BITS == fp
+
+    def is_posted(self, item: Dict) -> bool:
+        """True if the item's content hash or headline hash was already posted."""
+        return item['hash'] in self or item.get('headline_hash', item['hash']) in self
+
+    def __len__(self) -> int:
+        return len(self._records) + len(self._journal_fingerprints)
+
+    def add(self, key: str, now: float = None):
+        self.add_many([key], now)
+
+    def add_many(self, keys: Iterable[str], now: float = None):
+        """Appends the keys to the journal, stamped with today's date."""
+        new = {self.fingerprint(key) for key in keys} - self._journal_fingerprints
+        if not new:
+            return
+        day = self._day(now or time.time())
+        records = np.array(sorted((fp << self.DAY_BITS) | day for fp in new), dtype="<u8")
+        self._ensure_dir(self.journal_path)
+        with open(self.journal_path, 'ab') as f:
+            f.write(records.tobytes())
+        self._journal = np.concatenate([self._journal, records])
+        self._journal_fingerprints.update(new)
+        if len(self._journal) >= self.JOURNAL_LIMIT:
+            self.compact()
+        elif len(self) > self._bloom_bits // self.BITS_PER_KEY:
+            self._rebuild_bloom()
+        else:
+            self._set_bits(records >> np.uint64(self.DAY_BITS))
+
+    def compact(self, now: float = None):
+        """
+        Folds the journal into the sorted file, keeping one record per key at
+        its latest day and dropping those older than max_age_days.
+        """
+        records = np.unique(np.concatenate([np.asarray(self._records, dtype=np.uint64),
+                                            self._journal.astype(np.uint64)]))
+        records = records[self._days(records) >= self._cutoff_day(now)]
+        # Sorted by fingerprint then day, so a key's latest record is the last of its run
+        fingerprints = records >> np.uint64(self.DAY_BITS)
+        records = records[np.append(fingerprints[1:] != fingerprints[:-1], True)] if len(records) else records
+        expired = len(self._records) + len(self._journal) - len(records)
+        self._write_records(records)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._records = self._load_records()
+        self._journal = np.zeros(0, dtype="<u8")
+        self._journal_fingerprints = set()
+        self._rebuild_bloom()
+        print(f"Compacted {self.path}: {len(records)} fingerprints, {expired} expired or repeated records dropped")
+
+    @staticmethod
+    def merge_files(ours: str, theirs: str):
+        """
+        Unions the records of `theirs` into `ours`, for runs that raced on the
+        same fingerprint file or journal; the next compaction drops repeats.
+        """
+        merged = np.union1d(np.fromfile(ours, dtype="<u8") if os.path.exists(ours) else np.zeros(0, dtype="<u8"),
+                            np.fromfile(theirs, dtype="<u8"))
+        tmp = ours + ".tmp"
+        merged.astype("<u8").tofile(tmp)
+        os.replace(tmp, ours)
+
+    def close(self):
+        if self._bloom is not None:
+            self._bloom.close()
+            self._bloom = None
+
+    def _load_records(self) -> np.ndarray:
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < 8:
+            return np.zeros(0, dtype="<u8")
+        # Little-endian uint64, the native layout on the runners, so searches need no byte swapping
+        return np.memmap(self.path, dtype="<u8", mode="r")
+
+    def _read_journal(self) -> np.ndarray:
+        if not os.path.exists(self.journal_path):
+            return np.zeros(0, dtype="<u8")
+        with open(self.journal_path, 'rb') as f:
+            data = f.read()
+        # A run killed mid-append can leave a partial record at the end
+        return np.frombuffer(data[:len(data) - len(data) % 8], dtype="<u8").copy()
+
+    def _write_records(self, records: np.ndarray):
+        self._ensure_dir(self.path)
+        tmp = self.path + ".tmp"
+        records.astype("<u8").tofile(tmp)
+        # Drop our mapping before the file underneath it is replaced
+        self._records = np.zeros(0, dtype="<u8")
+        os.replace(tmp, self.path)
+
+    def _has_expired(self) -> bool:
+        cutoff = self._cutoff_day()
+        return any(len(records) and int(self._days(records).min()) < cutoff for records in (self._records, self._journal))
+
+    def _cutoff_day(self, now: float = None) -> int:
+        return self._day((now or time.time()) - self.max_age)
+
+    def _days(self, records: np.ndarray) -> np.ndarray:
+        return np.asarray(records, dtype=np.uint64) & np.uint64((1 << self.DAY_BITS) - 1)
+
+    def _day(self, ts: float) -> int:
+        return max(0, int(ts // 86400))
+
+    def _seed_from_legacy(self, legacy_files: List[str]):
+        now = time.time()
+        records = []
+        for legacy in legacy_files:
+            for ts, key in self._read_legacy(legacy):
+                records.append((self.fingerprint(key) << self.DAY_BITS) | self._day(ts or now))
+        if not records:
+            return
+        records = np.unique(np.array(records, dtype=np.uint64))
+        self._write_records(records)
+        print(f"Seeded {self.path} with {len(records)} fingerprints from legacy posted files")
+
+    @staticmethod
+    def _read_legacy(path: str) -> List[tuple]:
+        """(ts, key) pairs; ts is 0 for the JSON lists, which kept no dates."""
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if path.endswith(".log"):
+                    # HistoryLog format: "<ts>\t<key>"
+                    pairs = (line.rstrip("\n").partition("\t") for line in f if "\t" in line)
+                    return [(int(ts) if ts.isdigit() else 0, key) for ts, _, key in pairs]
+                data = json.load(f)
+            return [(0, str(key)) for key in data] if isinstance(data, list) else []
+        except Exception as e:
+            print(f"Ignoring unreadable legacy file {path}: {e}")
+            return []
+
+    def _open_bloom(self):
+        try:
+            with open(self.bloom_path, 'r+b') as f:
+                bloom = mmap.mmap(f.fileno(), 0)
+            header = self._HEADER.unpack_from(bloom, 0)
+            bits = header[2]
+            # The fingerprint file may have changed under the filter (merged runs), so check it still matches
+            if (header == self._bloom_header(bits) and len(self) <= bits // self.BITS_PER_KEY
+                    and len(bloom) == self._HEADER.size + bits // 8):
+                self._bloom, self._bloom_bits = bloom, bits
+                return
+            bloom.close()
+        except (OSError, ValueError, struct.error):
+            pass
+        self._rebuild_bloom()
+
+    def _rebuild_bloom(self):
+        """Sizes the filter for twice the current fingerprints and sets every bit from the index and journal."""
+        self.close()
+        capacity = max(2 * len(self), self.MIN_CAPACITY)
+        bits = capacity * self.BITS_PER_KEY
+        bits += -bits % 8
+        self._ensure_dir(self.bloom_path)
+        with open(self.bloom_path, 'wb') as f:
+            f.write(self._HEADER.pack(*self._bloom_header(bits)))
+            f.truncate(self._HEADER.size + bits // 8)
+        with open(self.bloom_path, 'r+b') as f:
+            self._bloom = mmap.mmap(f.fileno(), 0)
+        self._bloom_bits = bits
+        for records in (self._records, self._journal):
+            self._set_bits(np.asarray(records, dtype=np.uint64) >> np.uint64(self.DAY_BITS))
+
+    def _bloom_header(self, bits: int):
+        # Covers the sorted file only; journal bits are set again on every open
+        digest = int(np.bitwise_xor.reduce(self._records)) if len(self._records) else 0
+        return (self._MAGIC, self.HASHES, bits, len(self._records), digest)
+
+    def _positions(self, fingerprints: np.ndarray) -> np.ndarray:
+        # Double hashing from two overlapping slices of the (already uniform) 48-bit fingerprint
+        h1 = fingerprints & np.uint64(0xFFFFFFFF)
+        h2 = (fingerprints >> np.uint64(16)) | np.uint64(1)
+        steps = np.arange(self.HASHES, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self._bloom_bits)
+
+    def _set_bits(self, fingerprints: np.ndarray):
+        if not len(fingerprints):
+            return
+        positions = self._positions(fingerprints).ravel()
+        bits = np.frombuffer(self._bloom, dtype=np.uint8, offset=self._HEADER.size)
+        np.bitwise_or.at(bits, (positions >> np.uint64(3)).astype(np.intp),
+                         (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)))
+        del bits
+        self._bloom.flush()
+
+    def _bloom_may_contain(self, fp: int) -> bool:
+        h1, h2 = fp & 0xFFFFFFFF, (fp >> 16) | 1
+        bloom, offset = self._bloom, self._HEADER.size
+        for i in range(self.HASHES):
+            pos = (h1 + i * h2) % self._bloom_bits
+            if not bloom[offset + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    @staticmethod
+    def _ensure_dir(path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
@@ -0,0 +1,120 @@
+import json
+import os
+import time
+from collections import deque
+from typing import List
+
+class HistoryLog:
+    """
+    Append-only history ("<epoch seconds>\\t<value>" per line) of which only the
+    tail is ever read. Opening it reads the last `window` lines backwards from
+    the end of the file, appending writes one line, and once the file passes
+    max_bytes it is cut back to the newest `keep` entries. I/O per run therefore
+    stays the same however long the channel has been running.
+
+    If the log does not exist yet, the legacy JSON list next to it (same name,
+    .json extension) is imported once, oldest first.
+    """
+    BLOCK = 8192
+
+    def __init__(self, path: str, window: int = 50, keep: int = 500, max_bytes: int = 64 * 1024):
+        self.path = path
+        self.window = window
+        self.keep = max(keep, window)
+        self.max_bytes = max_bytes
+        if not os.path.exists(path):
+            self._migrate_legacy()
+        self._tail = deque(self._read_tail(window), maxlen=window)
+
+    def append(self, value: str, ts: float = None):
+        value = self._clean(value)
+        if not value:
+            return
+        try:
+            self._ensure_dir()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(f"{int(ts or time.time())}\t{value}\n")
+            self._tail.append(value)
+            if os.path.getsize(self.path) > self.max_bytes:
+                self.compact()
+        except Exception as e:
+            print(f"Error appending to {self.path}: {e}")
+
+    def last(self, n: int) -> List[str]:
+        """The n newest values, oldest first."""
+        if n <= 0:
+            return []
+        if n <= len(self._tail):
+            return list(self._tail)[-n:]
+        return self._read_tail(n) if n > self.window else list(self._tail)
+
+    def compact(self):
+        """Keeps only the newest `keep` lines."""
+        lines = self._read_tail_lines(self.keep)
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.writelines(line + "\n" for line in lines)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"Error compacting {self.path}: {e}")
+
+    def _read_tail(self, n: int) -> List[str]:
+        values = []
+        for line in self._read_tail_lines(n):
+            ts, sep, value = line.partition("\t")
+            if sep and ts.isdigit():
+                values.append(value)
+        return values
+
+    def _read_tail_lines(self, n: int) -> List[str]:
+        """Last n lines, read in blocks from the end of the file."""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            data = b""
+            # One extra newline so the first line kept is complete
+            while pos > 0 and data.count(b"\n") <= n:
+                step = min(self.BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        lines = data.split(b"\n")
+        if pos > 0:
+            lines = lines[1:]  # Partial line cut by the block boundary
+        return [line.decode('utf-8', errors='replace') for line in lines if line][-n:]
+
+    def _migrate_legacy(self):
+        legacy = os.path.splitext(self.path)[0] + ".json"
+        if legacy == self.path or not os.path.exists(legacy):
+            return
+        try:
+            with open(legacy, 'r', encoding='utf-8') as f:
+                values = json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable legacy file {legacy}: {e}")
+            return
+        if not isinstance(values, list):
+            return
+        # The old lists carry no times; date them by the file
+        ts = int(os.path.getmtime(legacy))
+        lines = [f"{ts}\t{value}\n" for value in map(self._clean, values) if value][-self.keep:]
+        try:
+            self._ensure_dir()
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.writelines(lines)
+            print(f"Migrated {len(lines)} entries from {legacy} to {self.path}")
+        except Exception as e:
+            print(f"Error migrating {legacy}: {e}")
+
+    def _ensure_dir(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _clean(value) -> str:
+        # One value per line; tabs and newlines would break the format
+        return " ".join(str(value).split())
@@ -0,0 +1,147 @@
+import json
+import os
+import time
+from typing import Iterator, List, Tuple
+import numpy as np
+
+def merge_state(ours: str, theirs: str, path: str) -> bool:
+    """
+    Merges `theirs` into `ours` in place, choosing the strategy from the repo
+    path of the file. Returns False for files this module does not know.
+    State only ever grows, so the common ancestor is not needed.
+    """
+    if path.endswith(".log"):
+        merge_logs(ours, theirs)
+    elif path.endswith(".bin"):
+        from .fingerprint_store import FingerprintStore
+        FingerprintStore.merge_files(ours, theirs)
+    elif path.endswith(".npz"):
+        merge_npz(ours, theirs)
+    elif path.endswith(".json"):
+        merge_json(ours, theirs, path)
+    else:
+        return False
+    return True
+
+
+def read_log(path: str) -> Iterator[Tuple[int, str]]:
+    """(ts, key) pairs of a "<ts>\\t<key>" log; malformed lines are skipped."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            ts, sep, key = line.rstrip("\n").partition("\t")
+            if sep and ts.isdigit():
+                yield int(ts), key
+
+
+def merge_logs(ours: str, theirs: str, out: str = None, max_age_days: float = None):
+    """
+    Linear merge of two time-sorted logs into `out` (default: ours), then
+    compacted: one line per key at its latest time, in time order, expired
+    keys dropped. Unsorted input (hand edits) falls back to a full sort.
+    """
+    a, b = list(read_log(ours)), list(read_log(theirs))
+    if not (_is_sorted(a) and _is_sorted(b)):
+        merged = sorted(a + b)
+    else:
+        merged = []
+        i = j = 0
+        while i < len(a) and j < len(b):
+            if a[i] <= b[j]:
+                merged.append(a[i])
+                i += 1
+            else:
+                merged.append(b[j])
+                j += 1
+        merged += a[i:] + b[j:]
+    write_log(out or ours, compact_entries(merged, max_age_days))
+
+
+def compact_log(path: str, max_age_days: float = None):
+    entries = list(read_log(path))
+    write_log(path, compact_entries(entries if _is_sorted(entries) else sorted(entries), max_age_days))
+
+
+def compact_entries(entries: List[Tuple[int, str]], max_age_days: float = None) -> List[Tuple[int, str]]:
+    latest = {}
+    for ts, key in entries:
+        # Later lines win, and re-inserting moves the key to the end so the order stays by time
+        latest.pop(key, None)
+        latest[key] = ts
+    cutoff = time.time() - max_age_days * 86400 if max_age_days else 0
+    return [(ts, key) for key, ts in latest.items() if ts >= cutoff]
+
+
+def write_log(path: str, entries: List[Tuple[int, str]]):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.writelines(f"{ts}\t{key}\n" for ts, key in entries)
+    os.replace(tmp, path)
+
+
+def merge_npz(ours: str, theirs: str):
+    """Union by key of two NearDuplicateIndex files; ours wins on conflicts."""
+    with np.load(ours) as a, np.load(theirs) as b:
+        keys, stamps, signatures = [a["keys"]], [a["ts"]], [a["signatures"]]
+        new = ~np.isin(b["keys"], a["keys"])
+        keys.append(b["keys"][new])
+        stamps.append(b["ts"][new])
+        signatures.append(b["signatures"][new])
+    with open(ours + ".tmp", 'wb') as f:
+        np.savez(f, keys=np.concatenate(keys), ts=np.concatenate(stamps), signatures=np.concatenate(signatures))
+    os.replace(ours + ".tmp", ours)
+
+
+def merge_json(ours: str, theirs: str, path: str = None):
+    """
+    Lists: ours in order, then the entries only theirs has. Dicts (cursors,
+    schedules): the union of keys; a key both sides have is merged by the
+    file's rule in DICT_RULES (so cursors only ever move forward), or keeps
+    ours for files without one. Anything else keeps ours.
+    """
+    with open(ours, 'r', encoding='utf-8') as f:
+        a = json.load(f)
+    with open(theirs, 'r', encoding='utf-8') as f:
+        b = json.load(f)
+    if isinstance(a, list) and isinstance(b, list):
+        seen = {json.dumps(x, sort_keys=True) for x in a}
+        merged = a + [x for x in b if json.dumps(x, sort_keys=True) not in seen]
+    elif isinstance(a, dict) and isinstance(b, dict):
+        rule = DICT_RULES.get(os.path.basename(path or ours))
+        merged = {**b, **a}
+        if rule:
+            for key in a.keys() & b.keys():
+                try:
+                    merged[key] = rule(a[key], b[key])
+                except Exception as e:
+                    print(f"Keeping our value for {key} in {path or ours}: {e}")
+    else:
+        return
+    with open(ours + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(merged, f, ensure_ascii=False)
+    os.replace(ours + ".tmp", ours)
+
+
+def _merge_feed_cursor(a: dict, b: dict) -> dict:
+    """RSSFetcher cursor: the later high-water mark, with the guids of both windows (newer side first)."""
+    newer, older = (a, b) if a.get("published_ts", 0) >= b.get("published_ts", 0) else (b, a)
+    guids = list(dict.fromkeys(newer.get("guids", []) + older.get("guids", [])))[:500]
+    return {**older, **newer, "published_ts": newer.get("published_ts", 0), "guids": guids}
+
+
+def _merge_schedule(a: dict, b: dict) -> dict:
+    """FeedScheduler state: the side that polled last, keeping the newest entry either side saw."""
+    latest = a if a.get("last_polled", 0) >= b.get("last_polled", 0) else b
+    return {**latest, "newest_ts": max(a.get("newest_ts", 0), b.get("newest_ts", 0))}
+
+
+DICT_RULES = {
+    "feed_cursors.json": _merge_feed_cursor,
+    "telegram_cursors.json": max,  # channel -> min_id
+    "feed_schedule.json": _merge_schedule,
+}
+
+
+def _is_sorted(entries: List[Tuple[int, str]]) -> bool:
+    return all(entries[i][0] <= entries[i + 1][0] for i in range(len(entries) - 1))
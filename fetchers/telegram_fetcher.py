@@ -1,4 +1,5 @@
 import os
+import json
 import asyncio
 from telethon import TelegramClient
 from typing import List, Dict
@@ -7,21 +8,45 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class TelegramFetcher:
-    def __init__(self, api_id: str, api_hash: str, phone: str = None):
+    def __init__(self, api_id: str, api_hash: str, phone: str = None, state_file: str = None):
         self.api_id = api_id
         self.api_hash = api_hash
         self.phone = phone
         self.client = TelegramClient('news_session', api_id, api_hash)
+        # Highest message id seen per channel; the next poll only asks for newer ones
+        self.state_file = state_file
+        self.min_ids = self._load_state()
+        self._pending_min_ids = {}
+
+    async def connect(self):
+        """Starts the session once; later fetches reuse the same connection."""
+        if not self.client.is_connected():
+            await self.client.start(phone=self.phone)
+
+    async def disconnect(self):
+        if self.client.is_connected():
+            await self.client.disconnect()
+
+    async def fetch_channels(self, channels: List[str], limit: int = 10) -> List[Dict]:
+        """
+        Fetches several channels concurrently over one session.
+        """
+        await self.connect()
+        results = await asyncio.gather(*(self.fetch_channel_news(channel, limit) for channel in channels))
+        return [item for items in results for item in items]
 
     async def fetch_channel_news(self, channel_username: str, limit: int = 10) -> List[Dict]:
         """
-        Fetches recent messages from a public Telegram channel.
+        Fetches messages newer than the channel's stored min_id from a public Telegram channel.
         Note: This requires valid API credentials.
         """
         news_items = []
+        min_id = self.min_ids.get(channel_username, 0)
+        newest_id = min_id
         try:
-            await self.client.start(phone=self.phone)
-            async for message in self.client.iter_messages(channel_username, limit=limit):
+            await self.connect()
+            async for message in self.client.iter_messages(channel_username, limit=limit, min_id=min_id):
+                newest_id = max(newest_id, message.id)
                 if message.text:
                     news_items.append({
                         "headline": message.text.split('\n')[0][:100], # First line as headline
@@ -32,20 +57,38 @@ class TelegramFetcher:
                     })
         except Exception as e:
             print(f"Error fetching from Telegram channel {channel_username}: {e}")
-        finally:
-            await self.client.disconnect()
+        if newest_id > min_id:
+            self._pending_min_ids[channel_username] = newest_id
         return news_items
 
+    def commit_min_ids(self):
+        """Persists the min_ids advanced since the last commit."""
+        if not self._pending_min_ids:
+            return
+        self.min_ids.update(self._pending_min_ids)
+        self._pending_min_ids = {}
+        if self.state_file:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            with open(self.state_file, 'w') as f:
+                json.dump(self.min_ids, f)
+
+    def _load_state(self) -> Dict:
+        if self.state_file and os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f: return json.load(f)
+            except: return {}
+        return {}
+
 if __name__ == "__main__":
     # This requires API_ID and API_HASH to be set in .env
     API_ID = os.getenv("TELEGRAM_API_ID")
     API_HASH = os.getenv("TELEGRAM_API_HASH")
-    
+
     if API_ID and API_HASH:
         fetcher = TelegramFetcher(API_ID, API_HASH)
         # Example channel: "durov" (just for testing structure)
         # loop = asyncio.get_event_loop()
-        # news = loop.run_until_complete(fetcher.fetch_channel_news("durov"))
+        # news = loop.run_until_complete(fetcher.fetch_channels(["durov"]))
         # print(f"Fetched {len(news)} items.")
     else:
         print("Telegram API credentials not found in environment variables.")
@@ -1,10 +1,12 @@
 from duckduckgo_search import DDGS
 import hashlib
 from typing import List, Dict
+from automation.media.search_cache import SearchCache
 
 class DDGFetcher:
     def __init__(self):
         self.ddgs = DDGS()
+        self.search_cache = SearchCache.shared()
 
     def fetch_latest_news(self, query: str = "international breaking news", limit: int = 5) -> List[Dict]:
         """
@@ -12,7 +14,9 @@ class DDGFetcher:
         """
         all_news = []
         try:
-            results = list(self.ddgs.news(query, max_results=limit))
+            results, _ = self.search_cache.get_or_search(
+                "news", query, lambda: self.ddgs.news(query, max_results=limit), max_results=limit
+            )
             for r in results:
                 news_item = {
                     "headline": r.get("title", ""),
@@ -1,6 +1,7 @@
 import json
 import os
 from datetime import datetime, timedelta
+from automation.content.keyword_matcher import KeywordMatcher
 
 class NewsClassifier:
     BREAKING_KEYWORDS = [
@@ -12,14 +13,15 @@ class NewsClassifier:
         "प्रमुख", "खबर", "समाचार", "तत्काल", "खतरा", "अवरुद्ध", "पक्राउ"
     ]
 
-    def __init__(self, breaking_window_hours: int = 2):
+    def __init__(self, breaking_window_hours: int = 2, keywords: list = None):
         self.breaking_window_hours = breaking_window_hours
+        self.matcher = KeywordMatcher(keywords or self.BREAKING_KEYWORDS)
 
     def classify(self, news_item: dict) -> str:
         """
         Classifies news item as BREAKING or NORMAL.
         """
-        is_urgent = any(kw in news_item['headline'].lower() for kw in self.BREAKING_KEYWORDS)
+        is_urgent = self.matcher.contains_any(news_item['headline'])
         
         # Check time recency (approximate if published_time is just a string)
         # For simplicity in this step, we mainly rely on keywords if timestamp is hard to parse